@@ -1,12 +1,12 @@
 """Common assertions for convenience"""
 import inspect
-from copy import deepcopy
 from functools import wraps
 from typing import (
     Any,
     Callable,
     List,
     Optional,
+    Type,
     TypeVar,
     Union,
     cast,
@@ -18,8 +18,14 @@ from typing import (
 import numpy as np
 import tf2_ros
 import tf_transformations
-from geometry_msgs.msg import PoseStamped, PoseWithCovarianceStamped, TransformStamped
+from geometry_msgs.msg import (
+    PoseStamped,
+    PoseWithCovarianceStamped,
+    Quaternion,
+    TransformStamped,
+)
 from rcl_interfaces.msg import ParameterDescriptor
+from rclpy.callback_groups import CallbackGroup
 from rclpy.exceptions import ParameterNotDeclaredException
 from rclpy.node import Node
 from std_msgs.msg import Header
@@ -113,13 +119,21 @@ def narrow_types(
     method: Optional[Callable] = arg if not isinstance(arg, Node) else None
 
     def inner_decorator(method):
+        # Type hints and signature of the decorated method are resolved once on
+        # first call instead of on every call. They are not resolved at decoration
+        # time because forward references may not be resolvable yet.
+        type_hints: Optional[dict] = None
+        signature: Optional[inspect.Signature] = None
+
         @wraps(method)
         def wrapper(*args, **kwargs):
+            nonlocal type_hints, signature
             node_instance: Node = args[0] if instance is None else instance
             assert isinstance(node_instance, Node)
 
-            type_hints = get_type_hints(method)
-            signature = inspect.signature(method)
+            if type_hints is None or signature is None:
+                type_hints = get_type_hints(method)
+                signature = inspect.signature(method)
             bound_arguments = signature.bind(*args, **kwargs)
             bound_arguments.apply_defaults()
 
@@ -230,7 +244,12 @@ class ROS:
 
     # TODO: callback type, use typevar
     @staticmethod
-    def subscribe(topic_name: str, qos, callback=None):
+    def subscribe(
+        topic_name: str,
+        qos,
+        callback=None,
+        callback_group: Optional[Type[CallbackGroup]] = None,
+    ):
         """
         A decorator to create a managed attribute (property) that subscribes to a
         ROS topic with the same type as the property. The property should be an
@@ -268,6 +287,11 @@ class ROS:
         :param qos: The Quality of Service settings for the topic subscription.
         :param callback: An optional callback method to be executed when a new
             message is received.
+        :param callback_group: An optional callback group type, e.g.
+            :class:`rclpy.callback_groups.MutuallyExclusiveCallbackGroup`. If
+            provided, the subscription gets its own callback group of this type
+            instead of the node default group, so that with a multi-threaded
+            executor a slow callback does not block the node's other callbacks.
         :return: A property that holds the latest message from the specified ROS
             topic, or None if no messages have been received yet.
         """
@@ -300,6 +324,9 @@ class ROS:
                         topic_name,
                         _on_message,
                         qos,
+                        callback_group=(
+                            callback_group() if callback_group is not None else None
+                        ),
                     )
                     setattr(self, cached_subscription_name, subscription)
 
@@ -417,7 +444,17 @@ class ROS:
                     obj, PoseWithCovarianceStamped
                 ):
                     transform = tf_.pose_to_transform(
-                        deepcopy(obj), child_frame_id=child_frame_id
+                        obj, child_frame_id=child_frame_id
+                    )
+                    # The transform shares its header and rotation with the
+                    # returned pose, copy only those instead of deep copying the
+                    # whole message so that inverting does not modify the pose
+                    transform.header = Header(
+                        stamp=obj.header.stamp, frame_id=obj.header.frame_id
+                    )
+                    rotation = transform.transform.rotation
+                    transform.transform.rotation = Quaternion(
+                        x=rotation.x, y=rotation.y, z=rotation.z, w=rotation.w
                     )
                 else:
                     assert isinstance(obj, TransformStamped)
@@ -1,5 +1,7 @@
 """Helper functions for ROS messaging"""
+import math
 from collections import namedtuple
+from functools import lru_cache
 from typing import Optional, Tuple, Union, cast
 
 import numpy as np
@@ -15,7 +17,7 @@ from geometry_msgs.msg import (
     TransformStamped,
     TwistWithCovarianceStamped,
 )
-from pyproj import Proj, transform
+from pyproj import Proj, Transformer
 from rclpy.node import Node
 from std_msgs.msg import Header
 
@@ -43,7 +45,9 @@ def as_ros_quaternion(q: np.ndarray) -> Quaternion:
     """
     q = q.squeeze()
     assert q.shape == (4,)
-    return Quaternion(x=q[0].item(), y=q[1].item(), z=q[2].item(), w=q[3].item())
+    # Convert all elements to Python floats at once instead of one by one
+    x, y, z, w = q.tolist()
+    return Quaternion(x=x, y=y, z=z, w=w)
 
 
 def as_np_quaternion(q: Quaternion) -> np.ndarray:
@@ -59,6 +63,74 @@ def as_np_quaternion(q: Quaternion) -> np.ndarray:
     return np.array([q.x, q.y, q.z, q.w])
 
 
+def rotation_matrix_from_quaternion(q: Quaternion) -> np.ndarray:
+    """Converts ROS :class:`geometric_msg.msg.Quaternion` to a rotation matrix
+
+    Reads the quaternion components directly from the message instead of going
+    through :func:`.as_np_quaternion` and :func:`tf_transformations.quaternion_matrix`
+    which allocate intermediate arrays. The quaternion does not need to be
+    normalized.
+
+    :param q: ROS quaternion message
+    :return: Rotation matrix of shape (3, 3), or identity if ``q`` is (close to)
+        zero
+    """
+    x, y, z, w = q.x, q.y, q.z, q.w
+    n = x * x + y * y + z * z + w * w
+    if n < np.finfo(float).eps * 4.0:
+        return np.identity(3)
+
+    s = 2.0 / n
+    xx, yy, zz = s * x * x, s * y * y, s * z * z
+    xy, xz, yz = s * x * y, s * x * z, s * y * z
+    wx, wy, wz = s * w * x, s * w * y, s * w * z
+    return np.array(
+        (
+            (1.0 - yy - zz, xy - wz, xz + wy),
+            (xy + wz, 1.0 - xx - zz, yz - wx),
+            (xz - wy, yz + wx, 1.0 - xx - yy),
+        )
+    )
+
+
+def quaternion_from_rotation_matrix(r: np.ndarray) -> np.ndarray:
+    """Converts rotation matrix to (x, y, z, w) format numpy array quaternion
+
+    Uses Shepperd's method which is cheaper than the eigendecomposition based
+    :func:`tf_transformations.quaternion_from_matrix`. Falls back to the latter if
+    ``r`` is not a proper rotation matrix (determinant not positive).
+
+    :param r: Rotation matrix of shape (3, 3), or homogenous matrix of shape
+        (4, 4) in which case only the rotation part is used
+    :return: NumPy array quaternion in (x, y, z, w) format with non-negative w
+    """
+    if np.linalg.det(r[:3, :3]) <= 0:
+        return np.array(tf_transformations.quaternion_from_matrix(r))
+
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = r[:3, :3].tolist()
+    trace = m00 + m11 + m22
+
+    # Pick the numerically most stable branch
+    if trace > 0:
+        s = 2.0 * math.sqrt(trace + 1.0)
+        q = ((m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s, 0.25 * s)
+    elif m00 > m11 and m00 > m22:
+        s = 2.0 * math.sqrt(1.0 + m00 - m11 - m22)
+        q = (0.25 * s, (m01 + m10) / s, (m02 + m20) / s, (m21 - m12) / s)
+    elif m11 > m22:
+        s = 2.0 * math.sqrt(1.0 + m11 - m00 - m22)
+        q = ((m01 + m10) / s, 0.25 * s, (m12 + m21) / s, (m02 - m20) / s)
+    else:
+        s = 2.0 * math.sqrt(1.0 + m22 - m00 - m11)
+        q = ((m02 + m20) / s, (m12 + m21) / s, 0.25 * s, (m10 - m01) / s)
+
+    q_arr = np.array(q)
+    if q_arr[3] < 0:
+        q_arr = -q_arr
+
+    return q_arr / np.linalg.norm(q_arr)
+
+
 def bounding_box_to_bbox(msg: BoundingBox) -> BBox:
     """Converts :class:`geographic_msgs.msg.BoundingBox` to :class:`.BBox`"""
     return BBox(
@@ -102,8 +174,7 @@ def create_pose_msg(
     t: np.ndarray,
 ) -> Optional[PoseStamped]:
     try:
-        H = matrices_to_homogenous(r, t)
-        q = tf_transformations.quaternion_from_matrix(H)
+        q = quaternion_from_rotation_matrix(r)
     except np.linalg.LinAlgError:
         return None
 
@@ -234,14 +305,16 @@ def extract_yaw(q: Quaternion) -> float:
     :param q: A list containing the quaternion [qx, qy, qz, qw].
     :return: The yaw angle in degrees.
     """
-    enu_yaw = np.arctan2(2 * (q.w * q.z + q.x * q.y), 1 - 2 * (q.y**2 + q.z**2))
-    enu_yaw_deg = np.degrees(enu_yaw)
+    # Use math instead of NumPy for scalars to avoid NumPy dispatch overhead
+    enu_yaw = math.atan2(2 * (q.w * q.z + q.x * q.y), 1 - 2 * (q.y**2 + q.z**2))
+    enu_yaw_deg = math.degrees(enu_yaw)
 
     # Convert ENU yaw to heading with North as origin
     heading = 90.0 - enu_yaw_deg
 
-    # Normalize to [0, 360) range
-    heading = (heading + 360) % 360
+    # Normalize to [0, 360) range, heading + 360 is always positive so fmod can
+    # be used directly
+    heading = math.fmod(heading + 360.0, 360.0)
 
     return heading
 
@@ -254,11 +327,12 @@ def extract_roll(q: Quaternion) -> float:
         format
     :return: The roll angle in degrees
     """
-    roll = np.arctan2(2 * (q.w * q.x + q.y * q.z), 1 - 2 * (q.x**2 + q.y**2))
-    roll_deg = np.degrees(roll)
+    roll = math.atan2(2 * (q.w * q.x + q.y * q.z), 1 - 2 * (q.x**2 + q.y**2))
+    roll_deg = math.degrees(roll)
 
-    # Normalize to [0, 360) range
-    roll_deg = (roll_deg + 360) % 360
+    # Normalize to [0, 360) range, roll_deg + 360 is always positive so fmod can
+    # be used directly
+    roll_deg = math.fmod(roll_deg + 360.0, 360.0)
 
     return roll_deg
 
@@ -298,11 +372,15 @@ def affine_to_proj(M: np.ndarray) -> FrameID:
     return proj_str
 
 
+@lru_cache(maxsize=8)
 def proj_to_affine(proj_str: str) -> np.ndarray:
     """Returns the affine transformation matrix M that corresponds to the provided
     PROJ string. The PROJ string should be in the format used by the `affine_to_proj`
     function.
 
+    The same PROJ string is typically parsed for many consecutive frames so the
+    result is cached and returned as a read-only array.
+
     :param proj_str: PROJ string representing an affine transformation
     :returns: 3x3 affine transformation matrix M
     """
@@ -323,10 +401,26 @@ def proj_to_affine(proj_str: str) -> np.ndarray:
 
     # Build the affine transformation matrix M
     M = np.array([[s11, s12, s13, xoff], [s21, s22, s23, yoff], [s31, s32, s33, zoff]])
+    M.setflags(write=False)
 
     return M
 
 
+@lru_cache(maxsize=1)
+def _wgs84_ecef_transformers() -> Tuple[Transformer, Transformer]:
+    """Returns :term:`WGS 84` to ECEF and ECEF to WGS 84 coordinate transformers
+
+    Creating the transformers is expensive compared to using them so they are
+    created once and shared.
+    """
+    proj_wgs84 = Proj(proj="latlong", datum="WGS84")
+    proj_ecef = Proj(proj="geocent", datum="WGS84")
+    return (
+        Transformer.from_proj(proj_wgs84, proj_ecef, always_xy=True),
+        Transformer.from_proj(proj_ecef, proj_wgs84, always_xy=True),
+    )
+
+
 def wgs84_to_ecef(lon: float, lat: float, alt: float) -> Tuple[float, float, float]:
     """Convert :term:`WGS 84` geodetic coordinates to ECEF (Earth-Centered, Earth-Fixed)
     coordinates.
@@ -340,9 +434,8 @@ def wgs84_to_ecef(lon: float, lat: float, alt: float) -> Tuple[float, float, flo
     coordinates to Cartesian coordinates (x, y, z) in the ECEF system (``earth`` frame
     in :term:`REP 105`).
     """
-    proj_wgs84 = Proj(proj="latlong", datum="WGS84")
-    proj_ecef = Proj(proj="geocent", datum="WGS84")
-    x, y, z = transform(proj_wgs84, proj_ecef, lon, lat, alt, radians=False)
+    wgs84_to_ecef_transformer, _ = _wgs84_ecef_transformers()
+    x, y, z = wgs84_to_ecef_transformer.transform(lon, lat, alt)
     return x, y, z
 
 
@@ -360,9 +453,8 @@ def ecef_to_wgs84(x: float, y: float, z: float) -> Tuple[float, float, float]:
     ECEF system (``earth`` frame in :term:`REP 105`) to geographic (latitude,
     longitude, altitude) coordinates.
     """
-    proj_wgs84 = Proj(proj="latlong", datum="WGS84")
-    proj_ecef = Proj(proj="geocent", datum="WGS84")
-    lon, lat, alt = transform(proj_ecef, proj_wgs84, x, y, z, radians=False)
+    _, ecef_to_wgs84_transformer = _wgs84_ecef_transformers()
+    lon, lat, alt = ecef_to_wgs84_transformer.transform(x, y, z)
     return lon, lat, alt
 
 
@@ -374,10 +466,10 @@ def enu_to_ecef_matrix(lon: float, lat: float) -> np.ndarray:
     :param lat: Latitude in decimal degrees.
     :return: Rotation matrix (3x3) for the transformation.
     """
-    lon, lat = np.radians(lon), np.radians(lat)
+    lon, lat = math.radians(lon), math.radians(lat)
 
-    slat, clat = np.sin(lat), np.cos(lat)
-    slon, clon = np.sin(lon), np.cos(lon)
+    slat, clat = math.sin(lat), math.cos(lat)
+    slon, clon = math.sin(lon), math.cos(lon)
 
     R = np.array(
         [
@@ -409,27 +501,20 @@ def poses_to_twist(
     dy = pose2.pose.pose.position.y - pose1.pose.position.y
     dz = pose2.pose.pose.position.z - pose1.pose.position.z
 
-    # Calculate angular velocities using quaternion differences
-    q1 = [
-        pose1.pose.orientation.x,
-        pose1.pose.orientation.y,
-        pose1.pose.orientation.z,
-        pose1.pose.orientation.w,
-    ]
-    q2 = [
-        pose2.pose.pose.orientation.x,
-        pose2.pose.pose.orientation.y,
-        pose2.pose.pose.orientation.z,
-        pose2.pose.pose.orientation.w,
-    ]
-
-    q_diff = tf_transformations.quaternion_multiply(
-        q2, tf_transformations.quaternion_inverse(q1)
+    # Calculate angular velocities using quaternion differences, reading the
+    # components directly from the messages. The inverse of q1 is its conjugate
+    # divided by its squared norm.
+    q1 = pose1.pose.orientation
+    q2 = pose2.pose.pose.orientation
+    n1 = q1.x * q1.x + q1.y * q1.y + q1.z * q1.z + q1.w * q1.w
+    x, y, z, w = _hamilton_product(
+        (q2.x, q2.y, q2.z, q2.w),
+        (-q1.x / n1, -q1.y / n1, -q1.z / n1, q1.w / n1),
     )
 
     # Converting quaternion to rotation vector (axis-angle)
-    angle = 2 * np.arccos(q_diff[3])  # Compute the rotation angle
-    axis = q_diff[:3] / np.sin(angle / 2)  # Normalize the axis
+    angle = 2 * np.arccos(w)  # Compute the rotation angle
+    axis = np.array((x, y, z)) / np.sin(angle / 2)  # Normalize the axis
     rotation_vector = angle * axis  # Multiply angle by the normalized axis
 
     ang_vel = rotation_vector / time_step
@@ -470,37 +555,62 @@ def create_identity_pose_stamped(x, y, z):
     return pose_stamped
 
 
-def angle_off_nadir(quaternion):
-    """Angle off nadir in radians"""
-    # Convert quaternion to a rotation matrix
-    rotation_matrix = tf_transformations.quaternion_matrix(quaternion)[:3, :3]
+def angle_off_nadir(quaternion) -> float:
+    """Angle off nadir in radians
 
-    # Camera's forward direction in the camera frame (assuming camera facing
-    # positive x-axis)
-    camera_forward = np.array([1, 0, 0])
+    Assumes the camera faces the positive x-axis in the camera frame, and that
+    nadir is the negative z-axis in the base frame.
 
-    # Transform the camera's forward direction to the base frame
-    camera_forward_base = np.dot(rotation_matrix, camera_forward)
-
-    # Nadir direction in the base frame (assuming nadir is negative z-axis
-    # in base frame)
-    nadir_direction = np.array([0, 0, -1])
-
-    # Calculate the angle between the forward vector and nadir direction
-    cos_theta = np.dot(camera_forward_base, nadir_direction) / (
-        np.linalg.norm(camera_forward_base) * np.linalg.norm(nadir_direction)
+    :param quaternion: Camera orientation in base frame in (x, y, z, w) format
+    :return: Angle between camera forward direction and nadir in radians
+    """
+    x, y, z, w = quaternion
+    n = x * x + y * y + z * z + w * w
+    if n < np.finfo(float).eps * 4.0:
+        # Identity rotation, camera forward direction is horizontal
+        return math.pi / 2
+
+    # Rotating the unit x-axis picks out the first column of the rotation matrix,
+    # and its dot product with nadir is the negated z-component of that column.
+    # Compute just that element instead of the full matrix and matrix-vector
+    # product.
+    cos_theta = 2.0 * (w * y - x * z) / n
+
+    # Clip to handle numerical inaccuracies, use builtins instead of np.clip for a
+    # scalar
+    return math.acos(max(-1.0, min(1.0, cos_theta)))
+
+
+def _normalized_quaternion(q: Quaternion) -> Tuple[float, float, float, float]:
+    """Returns ROS quaternion message as a normalized (x, y, z, w) tuple, or the
+    identity quaternion if ``q`` is (close to) zero
+    """
+    x, y, z, w = q.x, q.y, q.z, q.w
+    n = x * x + y * y + z * z + w * w
+    if n < np.finfo(float).eps * 4.0:
+        return 0.0, 0.0, 0.0, 1.0
+    n = math.sqrt(n)
+    return x / n, y / n, z / n, w / n
+
+
+def _hamilton_product(
+    q1: Tuple[float, float, float, float], q2: Tuple[float, float, float, float]
+) -> Tuple[float, float, float, float]:
+    """Returns Hamilton product ``q1 * q2`` of two (x, y, z, w) quaternions"""
+    x1, y1, z1, w1 = q1
+    x2, y2, z2, w2 = q2
+    return (
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
     )
-    angle_off_nadir = np.arccos(
-        np.clip(cos_theta, -1.0, 1.0)
-    )  # Clip to handle numerical inaccuracies
-
-    return angle_off_nadir
 
 
 def add_transform_stamped(
     transform1: Union[TransformStamped, PoseStamped], transform2: TransformStamped
 ) -> TransformStamped:
-    # Convert the TransformStamped objects to transformation matrices
+    # Translation and rotation of the first transform, which may also be a pose
     translation1 = (
         transform1.transform.translation
         if isinstance(transform1, TransformStamped)
@@ -512,51 +622,25 @@ def add_transform_stamped(
         else transform1.pose.orientation
     )
 
-    transform1_matrix = tf_transformations.concatenate_matrices(
-        tf_transformations.translation_matrix(
-            (
-                translation1.x,
-                translation1.y,
-                translation1.z,
-            )
-        ),
-        tf_transformations.quaternion_matrix(
-            (
-                rotation1.x,
-                rotation1.y,
-                rotation1.z,
-                rotation1.w,
-            )
-        ),
+    # Compose the rotations directly as a Hamilton product instead of going
+    # through homogenous matrices and extracting the quaternion back out of the
+    # combined matrix
+    rotation2 = transform2.transform.rotation
+    x, y, z, w = _hamilton_product(
+        _normalized_quaternion(rotation1), _normalized_quaternion(rotation2)
     )
-
-    transform2_matrix = tf_transformations.concatenate_matrices(
-        tf_transformations.translation_matrix(
-            (
-                transform2.transform.translation.x,
-                transform2.transform.translation.y,
-                transform2.transform.translation.z,
-            )
-        ),
-        tf_transformations.quaternion_matrix(
-            (
-                transform2.transform.rotation.x,
-                transform2.transform.rotation.y,
-                transform2.transform.rotation.z,
-                transform2.transform.rotation.w,
-            )
-        ),
+    if w < 0:
+        # Same sign convention as :func:`.quaternion_from_rotation_matrix`
+        x, y, z, w = -x, -y, -z, -w
+
+    # Translation of the composed transform is t1 + R1 @ t2
+    translation2 = transform2.transform.translation
+    translation = rotation_matrix_from_quaternion(rotation1) @ (
+        translation2.x,
+        translation2.y,
+        translation2.z,
     )
 
-    # Multiply the transformation matrices to get the composed transformation
-    combined_matrix = tf_transformations.concatenate_matrices(
-        transform1_matrix, transform2_matrix
-    )
-
-    # Extract the translation and rotation from the combined matrix
-    translation = tf_transformations.translation_from_matrix(combined_matrix)
-    rotation = tf_transformations.quaternion_from_matrix(combined_matrix)
-
     # Create a new TransformStamped object for the result
     combined_transform = TransformStamped()
     # combined_transform.header.stamp = rclpy.clock.Clock().now().to_msg()
@@ -565,12 +649,12 @@ def add_transform_stamped(
     combined_transform.header = transform1.header
     combined_transform.child_frame_id = transform2.child_frame_id
 
-    combined_transform.transform.translation.x = translation[0]
-    combined_transform.transform.translation.y = translation[1]
-    combined_transform.transform.translation.z = translation[2]
-    combined_transform.transform.rotation.x = rotation[0]
-    combined_transform.transform.rotation.y = rotation[1]
-    combined_transform.transform.rotation.z = rotation[2]
-    combined_transform.transform.rotation.w = rotation[3]
+    combined_transform.transform.translation.x = translation1.x + translation[0]
+    combined_transform.transform.translation.y = translation1.y + translation[1]
+    combined_transform.transform.translation.z = translation1.z + translation[2]
+    combined_transform.transform.rotation.x = x
+    combined_transform.transform.rotation.y = y
+    combined_transform.transform.rotation.z = z
+    combined_transform.transform.rotation.w = w
 
     return combined_transform
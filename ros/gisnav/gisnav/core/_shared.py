@@ -1,9 +1,15 @@
 """Shared static functions and constants for core nodes"""
-from typing import Final, Optional, Tuple
+import array
+import queue
+import threading
+from functools import lru_cache
+from typing import Callable, Final, Optional, Tuple
 
 import cv2
 import numpy as np
-from sensor_msgs.msg import CameraInfo
+from cv_bridge import CvBridge
+from rclpy.qos import HistoryPolicy, QoSPresetProfiles, QoSProfile
+from sensor_msgs.msg import CameraInfo, Image, PointField
 
 # TODO: make error model and generate covariance matrix dynamically
 # Create dummy covariance matrix
@@ -22,6 +28,18 @@ _covariance_matrix[4, 4] = _covariance_matrix[3, 3]
 _covariance_matrix[5, 5] = _covariance_matrix[3, 3]
 COVARIANCE_LIST_GLOBAL: Final = _covariance_matrix.flatten().tolist()
 
+_sensor_data_qos = QoSPresetProfiles.SENSOR_DATA.value
+LATEST_STATE_QOS: Final = QoSProfile(
+    history=HistoryPolicy.KEEP_LAST,
+    depth=1,
+    reliability=_sensor_data_qos.reliability,
+    durability=_sensor_data_qos.durability,
+)
+"""Best effort QoS profile for publishers where only the latest message is of
+interest. Same as the sensor data preset but without the deeper history buffer,
+which for large image messages only holds on to stale samples.
+"""
+
 
 KEYPOINT_DTYPE = np.dtype(
     [
@@ -34,6 +52,185 @@ KEYPOINT_DTYPE = np.dtype(
     ]
 )
 
+KEYPOINT_FIELDS: Final = [
+    PointField(name="x", offset=0, datatype=PointField.FLOAT32, count=1),
+    PointField(name="y", offset=4, datatype=PointField.FLOAT32, count=1),
+    PointField(name="z", offset=8, datatype=PointField.FLOAT32, count=1),
+    PointField(name="descriptor", offset=12, datatype=PointField.FLOAT32, count=128),
+]
+"""Keypoint :class:`.PointCloud2` message fields, shared by all outgoing messages
+instead of being rebuilt for each one"""
+
+_IMAGE_ENCODING_DTYPES: Final = {
+    "mono8": (np.uint8, 1),
+    "8UC1": (np.uint8, 1),
+    "mono16": (np.uint16, 1),
+    "16UC1": (np.uint16, 1),
+    "bgr8": (np.uint8, 3),
+    "rgb8": (np.uint8, 3),
+    "8UC3": (np.uint8, 3),
+}
+"""Supported :class:`.Image` encodings and their NumPy dtypes and channel counts"""
+
+
+def image_to_array(msg: Image) -> np.ndarray:
+    """Returns image message data as a NumPy array
+
+    Unlike :meth:`cv_bridge.CvBridge.imgmsg_to_cv2`, this returns a view into the
+    message data buffer instead of a copy. 16-bit data (e.g. elevation) is
+    reinterpreted directly in the byte order of the message. Channel order of
+    multi-channel images is not changed.
+
+    :param msg: Single channel 8-bit or 16-bit, or 3-channel 8-bit image message
+    :return: Image data as a NumPy array view of shape (height, width) for single
+        channel images, or (height, width, channels) for multi-channel images
+    :raise: :class:`ValueError` if the image encoding is not supported
+    """
+    if msg.encoding not in _IMAGE_ENCODING_DTYPES:
+        raise ValueError(f"Unsupported image encoding: {msg.encoding}")
+
+    dtype, channels = _IMAGE_ENCODING_DTYPES[msg.encoding]
+    dtype = np.dtype(dtype).newbyteorder(">" if msg.is_bigendian else "<")
+    if channels == 1:
+        return np.ndarray(
+            (msg.height, msg.width),
+            dtype=dtype,
+            buffer=msg.data,
+            strides=(msg.step, dtype.itemsize),
+        )
+
+    return np.ndarray(
+        (msg.height, msg.width, channels),
+        dtype=dtype,
+        buffer=msg.data,
+        strides=(msg.step, channels * dtype.itemsize, dtype.itemsize),
+    )
+
+
+def image_to_mono8(msg: Image, cv_bridge: CvBridge) -> np.ndarray:
+    """Returns image message data as a 2D 8-bit grayscale NumPy array
+
+    Messages that are already ``mono8`` are returned as a zero-copy view via
+    :func:`.image_to_array`, other encodings are converted with ``cv_bridge``.
+
+    :param msg: Image message
+    :param cv_bridge: CvBridge instance used to convert other encodings
+    :return: Grayscale image as a NumPy array of shape (height, width)
+    """
+    if msg.encoding in ("mono8", "8UC1"):
+        return image_to_array(msg)
+    return cv_bridge.imgmsg_to_cv2(msg, desired_encoding="mono8")
+
+
+def array_to_image(
+    arr: np.ndarray, encoding: str, msg: Optional[Image] = None
+) -> Image:
+    """Returns NumPy array as an image message
+
+    Unlike :meth:`cv_bridge.CvBridge.cv2_to_imgmsg`, this can write into an
+    existing message. If the size of the existing message data buffer matches, the
+    array is copied into it in place, so that a hot publisher does not need to
+    create a new message and data buffer for every published image.
+
+    :param arr: Image as a NumPy array of shape (height, width) or
+        (height, width, channels)
+    :param encoding: Image encoding, must match the array dtype and channels
+    :param msg: Optional existing image message to write into
+    :return: Image message with the array data, this is the input message if
+        one was provided
+    :raise: :class:`ValueError` if the image encoding is not supported
+    """
+    if encoding not in _IMAGE_ENCODING_DTYPES:
+        raise ValueError(f"Unsupported image encoding: {encoding}")
+
+    if msg is None:
+        msg = Image()
+
+    msg.height, msg.width = arr.shape[:2]
+    msg.encoding = encoding
+    msg.is_bigendian = int(arr.dtype.byteorder == ">")
+    msg.step = arr.nbytes // msg.height if msg.height > 0 else 0
+
+    if len(msg.data) == arr.nbytes:
+        np.copyto(
+            np.frombuffer(msg.data, dtype=arr.dtype).reshape(arr.shape),
+            arr,
+        )
+    else:
+        data = array.array("B")
+        data.frombytes(np.ascontiguousarray(arr))
+        msg.data = data
+
+    return msg
+
+
+_DIST_COEFFS: Final = np.zeros((4, 1))
+"""Distortion coefficients for PnP, images are assumed to be rectified"""
+
+
+class BackgroundWorker:
+    """Runs submitted tasks in a background daemon thread
+
+    Intended for keeping non-critical work such as drawing debug images off the
+    callback thread. Only the latest submitted task is kept pending: if the worker
+    cannot keep up, older pending tasks are dropped.
+    """
+
+    def __init__(self, name: str, logger) -> None:
+        """Class initializer
+
+        :param name: Name of the background thread
+        :param logger: ROS logger for logging errors raised by tasks
+        """
+        self._logger = logger
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[..., None], *args) -> None:
+        """Submits a task, replacing any pending task that has not yet started
+
+        :param func: Function to call in the background thread
+        :param args: Positional arguments to pass to the function
+        """
+        try:
+            self._queue.get_nowait()  # drop oldest pending task
+        except queue.Empty:
+            pass
+
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            # Another task was submitted concurrently, drop this one
+            pass
+
+    def _run(self) -> None:
+        """Runs submitted tasks until the program exits"""
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception as e:
+                self._logger.warning(f"Background task {func.__name__} failed: {e}")
+
+
+@lru_cache(maxsize=4)
+def _image_corners(height: int, width: int) -> np.ndarray:
+    """Returns image corner pixel coordinates in :func:`cv2.perspectiveTransform`
+    compatible shape
+
+    The image dimensions rarely change so the returned read-only array is cached.
+
+    :param height: Image height in pixels
+    :param width: Image width in pixels
+    :return: Array of shape (4, 1, 2) of image corners
+    """
+    corners = np.float32(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]]
+    ).reshape(-1, 1, 2)
+    corners.setflags(write=False)
+    return corners
+
 
 def visualize_matches_and_pose(
     camera_info: CameraInfo,
@@ -48,20 +245,21 @@ def visualize_matches_and_pose(
 
     def _project_fov(img, h_matrix):
         """Projects FOV on reference image"""
-        height, width = img.shape[0:2]
-        src_pts = np.float32(
-            [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]]
-        ).reshape(-1, 1, 2)
-        try:
-            return cv2.perspectiveTransform(src_pts, np.linalg.inv(h_matrix))
-        except np.linalg.LinAlgError:
+        src_pts = _image_corners(*img.shape[0:2])
+        success, h_matrix_inv = cv2.invert(h_matrix, flags=cv2.DECOMP_LU)
+        if not success:
             return src_pts
+        return cv2.perspectiveTransform(src_pts, h_matrix_inv)
 
     k = camera_info.k.reshape((3, 3))
-    h_matrix = k @ np.delete(np.hstack((r, t)), 2, 1)
+    # Homography for the z=0 plane is k @ [r1 r2 t], fill the columns directly
+    # instead of stacking [r t] and deleting the third column
+    rt = np.empty((3, 3))
+    rt[:, :2] = r[:, :2]
+    rt[:, 2] = t.ravel()
+    h_matrix = k @ rt
     projected_fov = _project_fov(qry, h_matrix)
 
-    projected_fov[:, :, 1] = projected_fov[:, :, 1]
     img_with_fov = cv2.polylines(
         ref, [np.int32(projected_fov)], True, 255, 3, cv2.LINE_AA
     )
@@ -90,36 +288,52 @@ def compute_pose(
     camera_info: CameraInfo,
     mkp_qry: np.ndarray,
     mkp_ref: np.ndarray,
-    elevation: np.ndarray,
+    elevation: Optional[np.ndarray],
 ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
-    def _compute_3d_points(mkp_ref: np.ndarray, elevation: np.ndarray) -> np.ndarray:
-        """Computes 3D points from matches"""
-        if elevation is None:
-            return np.hstack((mkp_ref, np.zeros((len(mkp_ref), 1))))
+    def _compute_3d_points(
+        mkp_ref: np.ndarray, elevation: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Computes 3D points from matches, assumes flat (zero) terrain if
+        elevation is not provided"""
+        # Fill a single preallocated array instead of stacking temporary arrays
+        mkp2_3d = np.zeros((len(mkp_ref), 3), dtype=np.float32)
+        mkp2_3d[:, 0:2] = mkp_ref
+        if elevation is not None:
+            # Pixel coordinates are non-negative so truncation equals floor
+            mkp2_3d[:, 2] = elevation[
+                mkp_ref[:, 1].astype(np.intp), mkp_ref[:, 0].astype(np.intp)
+            ]
 
-        x, y = np.transpose(np.floor(mkp_ref).astype(int))
-        z_values = elevation[y, x].reshape(-1, 1)
-        return np.hstack((mkp_ref, z_values))
+        return mkp2_3d
 
     def _solve_pnp(
         mkp2_3d: np.ndarray, mkp_qry: np.ndarray, k_matrix: np.ndarray
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """Computes :term:`pose` using :func:`cv2.solvePnPRansac`"""
-        dist_coeffs = np.zeros((4, 1))
-        _, r, t, _ = cv2.solvePnPRansac(
-            mkp2_3d,
-            mkp_qry,
-            k_matrix,
-            dist_coeffs,
-            useExtrinsicGuess=False,
-            iterationsCount=10,
-        )
-        r_matrix, _ = cv2.Rodrigues(r)
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Computes :term:`pose` using :func:`cv2.solvePnPRansac`
+
+        Uses the non-iterative SQPnP solver and falls back to EPnP if SQPnP
+        fails e.g. because of a degenerate point configuration.
+        """
+        # solvePnPRansac would otherwise convert the points to contiguous float32
+        mkp2_3d = np.ascontiguousarray(mkp2_3d, dtype=np.float32)
+        mkp_qry = np.ascontiguousarray(mkp_qry, dtype=np.float32)
+        for flags in (cv2.SOLVEPNP_SQPNP, cv2.SOLVEPNP_EPNP):
+            success, r, t, _ = cv2.solvePnPRansac(
+                mkp2_3d,
+                mkp_qry,
+                k_matrix,
+                _DIST_COEFFS,
+                useExtrinsicGuess=False,
+                iterationsCount=10,
+                flags=flags,
+            )
+            if success:
+                r_matrix, _ = cv2.Rodrigues(r)
+                return r_matrix, t
 
-        return r_matrix, t
+        return None
 
     mkp2_3d = _compute_3d_points(mkp_ref, elevation)
     k_matrix = camera_info.k.reshape((3, 3))
-    r, t = _solve_pnp(mkp2_3d, mkp_qry, k_matrix)
 
-    return r, t
+    return _solve_pnp(mkp2_3d, mkp_qry, k_matrix)
@@ -3,13 +3,15 @@ publishes a bounding box of the camera's ground-projected field of view. The
 bounding box is used by :class:`.GISNode` to retrieve orthoimagery for the
 vehicle's approximate global position.
 """
-from typing import Final, Optional
+import math
+from functools import lru_cache
+from typing import Final, Optional, Tuple
 
 import numpy as np
 import pyproj
 import rclpy
 import tf2_ros
-import tf_transformations
+from builtin_interfaces.msg import Time
 from geographic_msgs.msg import BoundingBox
 from geometry_msgs.msg import PoseStamped, TransformStamped
 from mavros_msgs.msg import GimbalDeviceAttitudeStatus
@@ -30,6 +32,27 @@ from ..constants import (
     ROS_TOPIC_MAVROS_LOCAL_POSITION,
     ROS_TOPIC_RELATIVE_FOV_BOUNDING_BOX,
 )
+from ._shared import LATEST_STATE_QOS
+
+
+@lru_cache(maxsize=4)
+def _utm_transformers(
+    utm_zone: int,
+) -> Tuple[pyproj.Transformer, pyproj.Transformer]:
+    """Returns WGS 84 to UTM and UTM to WGS 84 coordinate transformers
+
+    Creating the transformers is expensive compared to using them so they are
+    cached per UTM zone.
+
+    :param utm_zone: UTM zone number
+    :return: Tuple of WGS 84 to UTM and UTM to WGS 84 transformers
+    """
+    proj_latlon = pyproj.Proj(proj="latlong", datum="WGS84")
+    proj_utm = pyproj.Proj(proj="utm", zone=utm_zone, datum="WGS84")
+    return (
+        pyproj.Transformer.from_proj(proj_latlon, proj_utm, always_xy=True),
+        pyproj.Transformer.from_proj(proj_utm, proj_latlon, always_xy=True),
+    )
 
 
 class BBoxNode(Node):
@@ -44,6 +67,14 @@ class BBoxNode(Node):
     _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
     """A read-only ROS parameter descriptor"""
 
+    _BOUNDING_BOX_TOLERANCE_DEGREES: Final = 1e-7
+    """Bounding boxes whose corners differ less than this from the previously
+    published bounding box are not published again (about 1 cm)"""
+
+    _BOUNDING_BOX_REPUBLISH_INTERVAL_NS: Final = 1_000_000_000
+    """An unchanged bounding box is still republished at this interval so that
+    subscribers recover from dropped best-effort messages"""
+
     def __init__(self, *args, **kwargs):
         """Class initializer
 
@@ -59,6 +90,29 @@ class BBoxNode(Node):
         self.vehicle_pose
         self.gimbal_device_attitude_status
 
+        # Inputs and result of the last :attr:`.fov_bounding_box` computation. The
+        # bounding box is requested by both the global position and the gimbal
+        # attitude callbacks, so it is often requested again with unchanged inputs.
+        self._fov_bounding_box_inputs: Optional[
+            Tuple[Time, NavSatFix, CameraInfo]
+        ] = None
+        self._fov_bounding_box_cached: Optional[BoundingBox] = None
+
+        # Last published bounding box and its publish time in nanoseconds
+        self._published_bounding_box: Optional[BoundingBox] = None
+        self._published_bounding_box_ns: int = 0
+
+        # Stamp of the last published gisnav_base_link to gisnav_camera_link
+        # transform, used to skip republishing an unchanged transform
+        self._gisnav_camera_link_stamp: Optional[Time] = None
+
+        # Reused map to base_link_stabilized transform message, the broadcaster
+        # serializes the message when it is sent so only the changing fields need
+        # to be updated for each gimbal attitude message
+        self._stabilized_base_link_transform = TransformStamped()
+        self._stabilized_base_link_transform.header.frame_id = "map"
+        self._stabilized_base_link_transform.child_frame_id = "base_link_stabilized"
+
         # Needed for updating tf2 with camera to vehicle relative pose
         # and vehicle to wgs84 relative
         self._tf_broadcaster = TransformBroadcaster(self)
@@ -152,216 +206,260 @@ class BBoxNode(Node):
         """
 
     @property
-    @ROS.publish(
-        ROS_TOPIC_RELATIVE_FOV_BOUNDING_BOX, QoSPresetProfiles.SENSOR_DATA.value
-    )
+    @ROS.publish(ROS_TOPIC_RELATIVE_FOV_BOUNDING_BOX, LATEST_STATE_QOS)
     def fov_bounding_box(self) -> Optional[BoundingBox]:
-        """Published bounding box of the camera's ground-projected FOV"""
-
-        @narrow_types(self)
-        def _fov_and_principal_point_on_ground_plane(
-            transform: TransformStamped,
-            camera_info: CameraInfo,
-        ) -> Optional[np.ndarray]:
-            """Projects camera principal point and FOV corners onto ground plane
-
-            Assumes ground is a flat plane, does not take DEM into account
-
-            :return: Numpy array of FOV corners and principal point projected onto
-                ground plane (z=0 in EKF local frame) in following order: top-left,
-                top-right, bottom-right, bottom-left, principal point. Shape is (5, 2).
-                Coordinates are meters.
-            """
-            R = tf_transformations.quaternion_matrix(
-                tuple(messaging.as_np_quaternion(transform.transform.rotation))
-            )[:3, :3]
-
-            # Camera position in LTP centered in current location (not EKF local
-            # frame origin - only shares the z-coordinate!) - assume local
-            # frame z is altitude AGL
-            C = np.array((0, 0, transform.transform.translation.z))
-
-            intrinsics = camera_info.k.reshape((3, 3))
-
-            # List of image points: top-left, top-right, bottom-right, bottom-left,
-            # principal point
-            img_points = [
-                [0, 0],
-                [camera_info.width - 1, 0],
-                [camera_info.width - 1, camera_info.height - 1],
-                [0, camera_info.height - 1],
-                [camera_info.width / 2, camera_info.height / 2],
-            ]
+        """Published bounding box of the camera's ground-projected FOV, or None if
+        unknown or unchanged since it was last published
+        """
 
-            # Project each point to the ground
-            ground_points = []
-            for pt in img_points:
-                u, v = pt
+        transform = (
+            messaging.get_transform(
+                self,
+                "map",
+                "camera",
+                rclpy.time.Time(),  # self.vehicle_pose.header.stamp
+            )
+            if self.vehicle_pose is not None
+            else None
+        )
 
-                # Convert to normalized image coordinates
-                d_img = np.array([u, v, 1])
+        # Reuse the previous bounding box if the camera transform and messages it
+        # was computed from have not changed
+        nav_sat_fix, camera_info = self.nav_sat_fix, self.camera_info
+        if transform is not None and self._fov_bounding_box_inputs is not None:
+            (
+                stamp,
+                previous_nav_sat_fix,
+                previous_camera_info,
+            ) = self._fov_bounding_box_inputs
+            if (
+                stamp == transform.header.stamp
+                and previous_nav_sat_fix is nav_sat_fix
+                and previous_camera_info is camera_info
+            ):
+                return self._unpublished_bounding_box(self._fov_bounding_box_cached)
+
+        fov_on_ground_local_enu = self._fov_on_ground_plane(transform, camera_info)
+        if fov_on_ground_local_enu is not None:
+            bbox_local_enu_padded_square = self._square_bounding_box(
+                fov_on_ground_local_enu
+            )
+            bbox_latlon = self._enu_to_latlon(bbox_local_enu_padded_square, nav_sat_fix)
+            # Convert from numpy array to BoundingBox
+            bounding_box = (
+                self._bounding_box(bbox_latlon) if bbox_latlon is not None else None
+            )
+        else:
+            bounding_box = None
 
-                try:
-                    d_cam = np.linalg.inv(intrinsics) @ d_img
-                except np.linalg.LinAlgError as _:  # noqa: F841
-                    self.get_logger().error(
-                        "Could not invert camera intrinsics matrix. Cannot"
-                        "project FOV on ground."
-                    )
-                    return None
+        # TODO: here there used to be a fallback that would get bbox under
+        #  vehicle if FOV could not be projected. But that should not be needed
+        #  if everything works so it was removed from here.
 
-                # Convert direction to ENU frame
-                d_enu = R @ d_cam
+        if transform is not None:
+            self._fov_bounding_box_inputs = (
+                transform.header.stamp,
+                nav_sat_fix,
+                camera_info,
+            )
+            self._fov_bounding_box_cached = bounding_box
 
-                # Find intersection with ground plane
-                t = -C[2] / d_enu[2]
-                intersection = C + t * d_enu
+        return self._unpublished_bounding_box(bounding_box)
 
-                ground_points.append(intersection[:2])
+    @narrow_types
+    def _fov_on_ground_plane(
+        self,
+        transform: TransformStamped,
+        camera_info: CameraInfo,
+    ) -> Optional[np.ndarray]:
+        """Projects camera FOV corners onto ground plane
 
-            return np.vstack(ground_points)
+        Assumes ground is a flat plane, does not take DEM into account
 
-        @narrow_types(self)
-        def _enu_to_latlon(
-            bbox_coords: np.ndarray, navsatfix: NavSatFix
-        ) -> Optional[np.ndarray]:
-            """Convert EKF local frame ENU coordinates into WGS 84 coordinates
+        :return: Numpy array of FOV corners projected onto ground plane (z=0 in
+            EKF local frame) in following order: top-left, top-right,
+            bottom-right, bottom-left. Shape is (4, 2). Coordinates are meters.
+        """
+        R = messaging.rotation_matrix_from_quaternion(transform.transform.rotation)
+
+        # Camera position in LTP centered in current location (not EKF local
+        # frame origin - only shares the z-coordinate!) - assume local
+        # frame z is altitude AGL. The camera is at the origin of the
+        # horizontal plane, so only the altitude is needed.
+        altitude = transform.transform.translation.z
+
+        intrinsics = camera_info.k.reshape((3, 3))
+
+        # Image points in homogenous coordinates (one per row): top-left,
+        # top-right, bottom-right, bottom-left
+        img_points = np.array(
+            [
+                [0, 0, 1],
+                [camera_info.width - 1, 0, 1],
+                [camera_info.width - 1, camera_info.height - 1, 1],
+                [0, camera_info.height - 1, 1],
+            ],
+            dtype=np.float64,
+        )
 
-            :param bbox_coords: A bounding box in local ENU frame (units in meters)
-            :param navsatfix: Vehicle global position
+        # Invert intrinsics once for all points
+        try:
+            intrinsics_inv = np.linalg.inv(intrinsics)
+        except np.linalg.LinAlgError as _:  # noqa: F841
+            self.get_logger().error(
+                "Could not invert camera intrinsics matrix. Cannot"
+                "project FOV on ground."
+            )
+            return None
 
-            :return: Same bounding box in WGS 84 coordinates
-            """
+        # Project all points to the ground at once: convert to normalized image
+        # coordinates and then to directions in ENU frame
+        d_enu = img_points @ (R @ intrinsics_inv).T
 
-            def _determine_utm_zone(longitude):
-                """Determine the UTM zone for a given longitude."""
-                return int((longitude + 180) / 6) + 1
+        # Find intersections with ground plane
+        t = -altitude / d_enu[:, 2]
 
-            # Define the UTM zone and conversion
-            proj_latlon = pyproj.Proj(proj="latlong", datum="WGS84")
-            utm_zone = _determine_utm_zone(navsatfix.longitude)
-            proj_utm = pyproj.Proj(proj="utm", zone=utm_zone, datum="WGS84")
+        return t[:, np.newaxis] * d_enu[:, :2]
 
-            # Convert origin to UTM
-            origin_x, origin_y = pyproj.transform(
-                proj_latlon, proj_utm, navsatfix.longitude, navsatfix.latitude
-            )
+    @narrow_types
+    def _enu_to_latlon(
+        self, bbox_coords: np.ndarray, navsatfix: NavSatFix
+    ) -> Optional[np.ndarray]:
+        """Convert EKF local frame ENU coordinates into WGS 84 coordinates
 
-            # Add ENU offsets to the UTM origin
-            utm_x = origin_x + bbox_coords[:, 0]
-            utm_y = origin_y + bbox_coords[:, 1]
-
-            # Convert back to lat/lon
-            lon, lat = pyproj.transform(proj_utm, proj_latlon, utm_x, utm_y)
-
-            latlon_coords = np.column_stack((lon, lat))
-            assert latlon_coords.shape == bbox_coords.shape
-
-            return latlon_coords
-
-        @narrow_types(self)
-        def _square_bounding_box(enu_coords: np.ndarray) -> np.ndarray:
-            """Adjusts given bounding box to ensure it's square in the local frame
-
-            Adds padding in X (easting) and Y (northing) directions to ensure
-            camera FOV is fully enclosed by the bounding box, and to reduce need
-            to update the reference image so often.
-
-            :param enu_coords: A numpy array of shape (N, 2) representing ENU
-                coordinates.
-            :return: A numpy array of shape (N, 2) representing the adjusted
-                square bounding box.
-            """
-            min_e, min_n = np.min(enu_coords, axis=0)
-            max_e, max_n = np.max(enu_coords, axis=0)
-
-            delta_e = max_e - min_e
-            delta_n = max_n - min_n
-
-            if delta_e > delta_n:
-                # Expand in the north direction
-                difference = (delta_e - delta_n) / 2
-                min_n -= difference
-                max_n += difference
-            elif delta_n > delta_e:
-                # Expand in the east direction
-                difference = (delta_n - delta_e) / 2
-                min_e -= difference
-                max_e += difference
-
-            # Construct the squared bounding box coordinates
-            # Add padding to bounding box by expanding field of view bounding
-            # box width in each direction
-            padding = max_n - min_n
-            square_box = np.array(
-                [
-                    [min_e - padding, min_n - padding],
-                    [max_e + padding, min_n - padding],
-                    [max_e + padding, max_n + padding],
-                    [min_e - padding, max_n + padding],
-                ]
-            )
+        :param bbox_coords: A bounding box in local ENU frame (units in meters)
+        :param navsatfix: Vehicle global position
 
-            assert square_box.shape == enu_coords.shape
+        :return: Same bounding box in WGS 84 coordinates
+        """
+        # Define the UTM zone and conversion
+        utm_zone = int((navsatfix.longitude + 180) / 6) + 1
+        latlon_to_utm, utm_to_latlon = _utm_transformers(utm_zone)
 
-            return square_box
+        # Convert origin to UTM
+        origin_x, origin_y = latlon_to_utm.transform(
+            navsatfix.longitude, navsatfix.latitude
+        )
 
-        @narrow_types(self)
-        def _bounding_box(
-            fov_local_enu: np.ndarray,
-        ) -> BoundingBox:
-            """Create a :class:`.BoundingBox` message that envelops the provided
-            FOV coordinates.
+        # Add ENU offsets to the UTM origin
+        utm_x = origin_x + bbox_coords[:, 0]
+        utm_y = origin_y + bbox_coords[:, 1]
 
-            :param fov_local_enu: A 4x2 numpy array where N is the number of points,
-                and each row represents [longitude, latitude].
+        # Convert back to lat/lon
+        lon, lat = utm_to_latlon.transform(utm_x, utm_y)
 
-            :return: A :class:`.BoundingBox`
-            """
-            assert fov_local_enu.shape == (4, 2)
+        latlon_coords = np.column_stack((lon, lat))
+        assert latlon_coords.shape == bbox_coords.shape
 
-            # Find the min and max values for longitude and latitude
-            min_lon, min_lat = np.min(fov_local_enu, axis=0)
-            max_lon, max_lat = np.max(fov_local_enu, axis=0)
+        return latlon_coords
 
-            # Create and populate the BoundingBox message
-            bbox = BoundingBox()
-            bbox.min_pt.latitude = min_lat
-            bbox.min_pt.longitude = min_lon
-            bbox.max_pt.latitude = max_lat
-            bbox.max_pt.longitude = max_lon
+    @staticmethod
+    def _square_bounding_box(enu_coords: np.ndarray) -> np.ndarray:
+        """Adjusts given bounding box to ensure it's square in the local frame
 
-            return bbox
+        Adds padding in X (easting) and Y (northing) directions to ensure
+        camera FOV is fully enclosed by the bounding box, and to reduce need
+        to update the reference image so often.
 
-        transform = (
-            messaging.get_transform(
-                self,
-                "map",
-                "camera",
-                rclpy.time.Time(),  # self.vehicle_pose.header.stamp
-            )
-            if self.vehicle_pose is not None
-            else None
+        :param enu_coords: A numpy array of shape (N, 2) representing ENU
+            coordinates.
+        :return: A numpy array of shape (N, 2) representing the adjusted
+            square bounding box.
+        """
+        min_e, min_n = np.min(enu_coords, axis=0)
+        max_e, max_n = np.max(enu_coords, axis=0)
+
+        delta_e = max_e - min_e
+        delta_n = max_n - min_n
+
+        if delta_e > delta_n:
+            # Expand in the north direction
+            difference = (delta_e - delta_n) / 2
+            min_n -= difference
+            max_n += difference
+        elif delta_n > delta_e:
+            # Expand in the east direction
+            difference = (delta_n - delta_e) / 2
+            min_e -= difference
+            max_e += difference
+
+        # Construct the squared bounding box coordinates
+        # Add padding to bounding box by expanding field of view bounding
+        # box width in each direction
+        padding = max_n - min_n
+        square_box = np.array(
+            [
+                [min_e - padding, min_n - padding],
+                [max_e + padding, min_n - padding],
+                [max_e + padding, max_n + padding],
+                [min_e - padding, max_n + padding],
+            ]
         )
 
-        fov_and_c_on_ground_local_enu = _fov_and_principal_point_on_ground_plane(
-            transform, self.camera_info
-        )
-        if fov_and_c_on_ground_local_enu is not None:
-            fov_on_ground_local_enu = fov_and_c_on_ground_local_enu[:4]
-            bbox_local_enu_padded_square = _square_bounding_box(fov_on_ground_local_enu)
-            bounding_box = _enu_to_latlon(
-                bbox_local_enu_padded_square, self.nav_sat_fix
-            )
-            # Convert from numpy array to BoundingBox
-            bounding_box = _bounding_box(bounding_box)
-        else:
-            bounding_box = None
+        assert square_box.shape == enu_coords.shape
 
-        # TODO: here there used to be a fallback that would get bbox under
-        #  vehicle if FOV could not be projected. But that should not be needed
-        #  if everything works so it was removed from here.
+        return square_box
+
+    @staticmethod
+    def _bounding_box(
+        fov_local_enu: np.ndarray,
+    ) -> BoundingBox:
+        """Create a :class:`.BoundingBox` message that envelops the provided
+        FOV coordinates.
+
+        :param fov_local_enu: A 4x2 numpy array where N is the number of points,
+            and each row represents [longitude, latitude].
+
+        :return: A :class:`.BoundingBox`
+        """
+        assert fov_local_enu.shape == (4, 2)
+
+        # Find the min and max values for longitude and latitude
+        min_lon, min_lat = np.min(fov_local_enu, axis=0)
+        max_lon, max_lat = np.max(fov_local_enu, axis=0)
+
+        # Create and populate the BoundingBox message
+        bbox = BoundingBox()
+        bbox.min_pt.latitude = min_lat
+        bbox.min_pt.longitude = min_lon
+        bbox.max_pt.latitude = max_lat
+        bbox.max_pt.longitude = max_lon
+
+        return bbox
 
+    def _unpublished_bounding_box(
+        self, bounding_box: Optional[BoundingBox]
+    ) -> Optional[BoundingBox]:
+        """Returns the bounding box if it should be published, or None if it is
+        the same as the previously published bounding box
+
+        Unchanged bounding boxes are still returned at
+        :attr:`._BOUNDING_BOX_REPUBLISH_INTERVAL_NS`.
+
+        :param bounding_box: Bounding box to publish
+        :return: The input bounding box, or None if it should not be published
+        """
+        if bounding_box is None:
+            return None
+
+        now_ns = self.get_clock().now().nanoseconds
+        previous = self._published_bounding_box
+        if (
+            previous is not None
+            and now_ns - self._published_bounding_box_ns
+            < self._BOUNDING_BOX_REPUBLISH_INTERVAL_NS
+            and max(
+                abs(bounding_box.min_pt.latitude - previous.min_pt.latitude),
+                abs(bounding_box.min_pt.longitude - previous.min_pt.longitude),
+                abs(bounding_box.max_pt.latitude - previous.max_pt.latitude),
+                abs(bounding_box.max_pt.longitude - previous.max_pt.longitude),
+            )
+            < self._BOUNDING_BOX_TOLERANCE_DEGREES
+        ):
+            return None
+
+        self._published_bounding_box = bounding_box
+        self._published_bounding_box_ns = now_ns
         return bounding_box
 
     def _gimbal_device_attitude_status_cb(
@@ -371,8 +469,17 @@ class BBoxNode(Node):
 
         :param msg: :class:`.GimbalDeviceAttitudeStatus` message from MAVROS
         """
-        self._publish_stabilized_base_link_frame(msg.header.stamp)
-        self._publish_for_gisnav_frames()
+        # Broadcast both frames with a single tf message
+        transforms = [
+            transform
+            for transform in (
+                self._stabilized_base_link_frame(msg.header.stamp),
+                self._gisnav_camera_link_frame(),
+            )
+            if transform is not None
+        ]
+        if transforms:
+            self._tf_broadcaster.sendTransform(transforms)
         self.fov_bounding_box
 
     @property
@@ -384,8 +491,8 @@ class BBoxNode(Node):
     def gimbal_device_attitude_status(self) -> Optional[GimbalDeviceAttitudeStatus]:
         """Camera orientation from FCU, or None unknown"""
 
-    def _publish_stabilized_base_link_frame(self, stamp) -> None:
-        """Publishes ``base_link_frd_stabilized`` tf frame
+    def _stabilized_base_link_frame(self, stamp) -> Optional[TransformStamped]:
+        """Returns ``base_link_frd_stabilized`` tf frame, or None if unknown
 
         The MAVROS published gimbal_0 frame does not adjust for stabilization
         (shows up wrong in RViz when vehicle has pitch or roll i.e. when flying
@@ -402,49 +509,46 @@ class BBoxNode(Node):
             )
 
             # Extract the yaw from the transform
-            _, _, yaw = tf_transformations.euler_from_quaternion(
-                [
-                    trans.transform.rotation.x,
-                    trans.transform.rotation.y,
-                    trans.transform.rotation.z,
-                    trans.transform.rotation.w,
-                ]
-            )
+            q = trans.transform.rotation
+            yaw = math.atan2(2 * (q.w * q.z + q.x * q.y), 1 - 2 * (q.y**2 + q.z**2))
 
-            # Create a new transform with only the yaw for map to
+            # Update the transform with only the yaw for map to
             # base_link_frd_stabilized
-            now = rclpy.time.Time(seconds=stamp.sec, nanoseconds=stamp.nanosec)
-            new_trans = TransformStamped()
-            new_trans.header.stamp = now.to_msg()
-            new_trans.header.frame_id = "map"
-            new_trans.child_frame_id = "base_link_stabilized"
+            new_trans = self._stabilized_base_link_transform
+            new_trans.header.stamp = stamp
             new_trans.transform.translation.x = trans.transform.translation.x
             new_trans.transform.translation.y = trans.transform.translation.y
             new_trans.transform.translation.z = trans.transform.translation.z
 
-            # Create a quaternion from the yaw
-            q = tf_transformations.quaternion_from_euler(0, 0, yaw)
-            new_trans.transform.rotation.x = q[0]
-            new_trans.transform.rotation.y = q[1]
-            new_trans.transform.rotation.z = q[2]
-            new_trans.transform.rotation.w = q[3]
+            # Create a quaternion from the yaw (rotation about z axis only)
+            new_trans.transform.rotation.x = 0.0
+            new_trans.transform.rotation.y = 0.0
+            new_trans.transform.rotation.z = math.sin(yaw / 2)
+            new_trans.transform.rotation.w = math.cos(yaw / 2)
 
-            # Publish the new transform
-            self._tf_broadcaster.sendTransform(new_trans)
+            return new_trans
 
         except Exception as e:
             self.get_logger().warn(f"Could not transform map to base_link: {e}")
+            return None
 
-    def _publish_for_gisnav_frames(self) -> None:
-        """Publishes gisnav_base_link to gisnav_camera_link transform"""
+    def _gisnav_camera_link_frame(self) -> Optional[TransformStamped]:
+        """Returns gisnav_base_link to gisnav_camera_link transform, or None if
+        unknown or unchanged since it was last published
+        """
 
         try:
             transform = self._tf_buffer.lookup_transform(
                 "base_link", "camera", rclpy.time.Time()
             )
+            if transform.header.stamp == self._gisnav_camera_link_stamp:
+                # Camera has not moved relative to base_link since last publish
+                return None
+            self._gisnav_camera_link_stamp = transform.header.stamp
+
             transform.header.frame_id = "gisnav_base_link"
             transform.child_frame_id = "gisnav_camera_link"
-            self._tf_broadcaster.sendTransform(transform)
+            return transform
         except (
             tf2_ros.LookupException,
             tf2_ros.ConnectivityException,
@@ -454,3 +558,4 @@ class BBoxNode(Node):
                 f"Could not publish gisnav_base_link to gisnav_camera_link due "
                 f"to exception: {e}"
             )
+            return None
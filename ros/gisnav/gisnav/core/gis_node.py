@@ -1,6 +1,7 @@
 """This module contains :class:`.GISNode`, a ROS node that requests
 orthoimagery from the GIS and publishes it to ROS.
 """
+import math
 from copy import deepcopy
 from typing import IO, Final, List, Optional, Tuple
 
@@ -30,6 +31,7 @@ from ..constants import (
     ROS_TOPIC_RELATIVE_ORTHOIMAGE,
     FrameID,
 )
+from ._shared import LATEST_STATE_QOS
 
 
 class GISNode(Node):
@@ -160,6 +162,13 @@ class GISNode(Node):
 
         self.old_bounding_box: Optional[BoundingBox] = None
 
+        # Inputs and result of the last orthoimage overlap check, the check is
+        # made on every publish timer tick but the inputs change less often
+        self._overlap_check_inputs: Optional[
+            Tuple[BoundingBox, BoundingBox, float]
+        ] = None
+        self._overlap_check_result: Optional[bool] = None
+
     @property
     @ROS.parameter(ROS_D_URL, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
     def wms_url(self) -> Optional[str]:
@@ -281,37 +290,37 @@ class GISNode(Node):
         Destroys :attr:`._connect_wms_timer` if instantiation is successful
         """
 
-        @narrow_types(self)
-        def _connect_wms(url: str, version: str, timeout: int, poll_rate: float):
-            try:
-                assert self._wms_client is None
-                self.get_logger().info(f"Connecting to WMS endpoint at {url}...")
-                self._wms_client = WebMapService(url, version=version, timeout=timeout)
-                self.get_logger().info("WMS client connection established.")
-
-                # We have the WMS client instance - we can now destroy the timer
-                assert self._connect_wms_timer is not None
-                self._connect_wms_timer.destroy()
-            except requests.exceptions.ConnectionError as _:  # noqa: F841
-                # Expected error if no connection
-                self.get_logger().error(
-                    f"Could not instantiate WMS client due to connection error, "
-                    f"trying again in {1 / poll_rate} seconds..."
-                )
-                assert self._wms_client is None
-            except Exception as e:
-                # TODO: handle other exception types
-                self.get_logger().error(
-                    f"Could not instantiate WMS client due to unexpected exception "
-                    f"type ({type(e)}), trying again in {1 / poll_rate} seconds..."
-                )
-                assert self._wms_client is None
-
         if self._wms_client is None:
-            _connect_wms(
+            self._connect_wms(
                 self.wms_url, self.wms_version, self.wms_timeout, self.wms_poll_rate
             )
 
+    @narrow_types
+    def _connect_wms(self, url: str, version: str, timeout: int, poll_rate: float):
+        try:
+            assert self._wms_client is None
+            self.get_logger().info(f"Connecting to WMS endpoint at {url}...")
+            self._wms_client = WebMapService(url, version=version, timeout=timeout)
+            self.get_logger().info("WMS client connection established.")
+
+            # We have the WMS client instance - we can now destroy the timer
+            assert self._connect_wms_timer is not None
+            self._connect_wms_timer.destroy()
+        except requests.exceptions.ConnectionError as _:  # noqa: F841
+            # Expected error if no connection
+            self.get_logger().error(
+                f"Could not instantiate WMS client due to connection error, "
+                f"trying again in {1 / poll_rate} seconds..."
+            )
+            assert self._wms_client is None
+        except Exception as e:
+            # TODO: handle other exception types
+            self.get_logger().error(
+                f"Could not instantiate WMS client due to unexpected exception "
+                f"type ({type(e)}), trying again in {1 / poll_rate} seconds..."
+            )
+            assert self._wms_client is None
+
     @narrow_types
     def _bounding_box_with_padding_for_latlon(
         self, latitude: float, longitude: float, padding: float = 600.0
@@ -319,7 +328,7 @@ class GISNode(Node):
         """Adds 100 meters of padding to coordinates on both sides"""
         meters_in_degree = 111045.0  # at 0 latitude
         lat_degree_meter = meters_in_degree
-        lon_degree_meter = meters_in_degree * np.cos(np.radians(latitude))
+        lon_degree_meter = meters_in_degree * math.cos(math.radians(latitude))
 
         delta_lat = padding / lat_degree_meter
         delta_lon = padding / lon_degree_meter
@@ -373,15 +382,12 @@ class GISNode(Node):
         after arbitrary 2D rotation. The height and width will both be equal to
         the diagonal of the declared camera frame dimensions.
         """
+        return self._orthoimage_diagonal_size(self.camera_info)
 
-        @narrow_types(self)
-        def _orthoimage_size(camera_info: CameraInfo):
-            diagonal = int(
-                np.ceil(np.sqrt(camera_info.width**2 + camera_info.height**2))
-            )
-            return diagonal, diagonal
-
-        return _orthoimage_size(self.camera_info)
+    @narrow_types
+    def _orthoimage_diagonal_size(self, camera_info: CameraInfo):
+        diagonal = int(math.ceil(math.hypot(camera_info.width, camera_info.height)))
+        return diagonal, diagonal
 
     @narrow_types
     def _request_orthoimage_for_bounding_box(
@@ -441,7 +447,7 @@ class GISNode(Node):
             self.get_logger().debug(
                 "No DEM layer provided, assuming flat (=zero) elevation model."
             )
-            dem = np.zeros_like(img)
+            dem = np.zeros((*img.shape[:2], 1), dtype=np.uint8)
 
         # TODO: handle dem is None from _get_map call
         assert img is not None and dem is not None
@@ -463,33 +469,52 @@ class GISNode(Node):
         :return: True if new orthoimage should be requested from onboard GIS
         """
 
-        @narrow_types(self)
-        def _orthoimage_overlap_is_too_low(
-            new_bounding_box: BoundingBox,
-            old_bounding_box: BoundingBox,
-            min_map_overlap_update_threshold: float,
-        ) -> bool:
-            bbox = tf_.bounding_box_to_bbox(new_bounding_box)
-            bbox_previous = tf_.bounding_box_to_bbox(old_bounding_box)
-            bbox1, bbox2 = box(*bbox), box(*bbox_previous)
-            ratio1 = bbox1.intersection(bbox2).area / bbox1.area
-            ratio2 = bbox2.intersection(bbox1).area / bbox2.area
-            ratio = min(ratio1, ratio2)
-            if ratio > min_map_overlap_update_threshold:
-                return False
-
+        if self.old_bounding_box is None:
             return True
 
-        return self.old_bounding_box is None or _orthoimage_overlap_is_too_low(
+        inputs = (
             self.bounding_box,
             self.old_bounding_box,
             self.min_map_overlap_update_threshold,
         )
+        # Reuse the previous result if the bounding boxes are the same messages
+        # and the threshold has not changed
+        if self._overlap_check_inputs is not None and (
+            inputs[0] is self._overlap_check_inputs[0]
+            and inputs[1] is self._overlap_check_inputs[1]
+            and inputs[2] == self._overlap_check_inputs[2]
+        ):
+            return self._overlap_check_result
+
+        result = self._orthoimage_overlap_is_too_low(*inputs)
+        self._overlap_check_inputs = inputs
+        self._overlap_check_result = result
+        return result
+
+    @narrow_types
+    def _orthoimage_overlap_is_too_low(
+        self,
+        new_bounding_box: BoundingBox,
+        old_bounding_box: BoundingBox,
+        min_map_overlap_update_threshold: float,
+    ) -> bool:
+        bbox = tf_.bounding_box_to_bbox(new_bounding_box)
+        bbox_previous = tf_.bounding_box_to_bbox(old_bounding_box)
+        bbox1, bbox2 = box(*bbox), box(*bbox_previous)
+        # Intersection is symmetric so it only needs to be computed once
+        intersection_area = bbox1.intersection(bbox2).area
+        ratio1 = intersection_area / bbox1.area
+        ratio2 = intersection_area / bbox2.area
+        ratio = min(ratio1, ratio2)
+        if ratio > min_map_overlap_update_threshold:
+            return False
+
+        return True
 
     @property
     @ROS.publish(
         ROS_TOPIC_RELATIVE_ORTHOIMAGE,
-        QoSPresetProfiles.SENSOR_DATA.value,
+        LATEST_STATE_QOS,
     )
     @cache_if(_should_request_orthoimage)
     def orthoimage(self) -> Optional[OrthoImage]:
@@ -583,17 +608,18 @@ class GISNode(Node):
 
         def _haversine_distance(lat1, lon1, lat2, lon2) -> float:
             R = 6371000  # Radius of the Earth in meters
-            lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
-            lat2_rad, lon2_rad = np.radians(lat2), np.radians(lon2)
+            lat1_rad, lon1_rad = math.radians(lat1), math.radians(lon1)
+            lat2_rad, lon2_rad = math.radians(lat2), math.radians(lon2)
 
             delta_lat = lat2_rad - lat1_rad
             delta_lon = lon2_rad - lon1_rad
 
             a = (
-                np.sin(delta_lat / 2) ** 2
-                + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon / 2) ** 2
+                math.sin(delta_lat / 2) ** 2
+                + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
             )
-            c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+            # Clamp rounding errors, math.sqrt raises on negative input unlike np.sqrt
+            c = 2 * math.atan2(math.sqrt(a), math.sqrt(max(0.0, 1 - a)))
 
             return R * c
 
@@ -8,19 +8,24 @@ drift-free.
 The pose is estimated by finding matching keypoints between the query and
 reference images and then solving the resulting PnP problem.
 """
-from typing import List, Optional, Tuple, cast
+from typing import Final, Optional, Tuple, cast
 
 import cv2
 import numpy as np
 import rclpy
 import tf2_ros
-import tf_transformations
 import torch
 from builtin_interfaces.msg import Time
 from cv_bridge import CvBridge
-from geometry_msgs.msg import PoseWithCovariance, PoseWithCovarianceStamped
+from geometry_msgs.msg import (
+    PoseWithCovariance,
+    PoseWithCovarianceStamped,
+    TransformStamped,
+)
 from gisnav_msgs.msg import OrthoStereoImage  # type: ignore[attr-defined]
-from kornia.feature import LightGlueMatcher, get_laf_center, laf_from_center_scale_ori
+from kornia.feature import LightGlueMatcher, laf_from_center_scale_ori
+from rcl_interfaces.msg import ParameterDescriptor
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
 from robot_localization.srv import SetPose
@@ -40,7 +45,10 @@ from ..constants import (
 )
 from ._shared import (  # COVARIANCE_LIST_GLOBAL,
     KEYPOINT_DTYPE,
+    BackgroundWorker,
     compute_pose,
+    image_to_array,
+    image_to_mono8,
     visualize_matches_and_pose,
 )
 
@@ -71,6 +79,18 @@ class PoseNode(Node):
     Keep this low to increase matching speed especially on resource constrained systems.
     """
 
+    MAX_MATCHES = 512
+    """Max number of best keypoint matches to use for pose estimation"""
+
+    ROS_D_COMPILE_MATCHER = False
+    """Default for :attr:`.compile_matcher`"""
+
+    ROS_D_MIN_REFERENCE_TEXTURE = 10.0
+    """Default for :attr:`.min_reference_texture`"""
+
+    _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
+    """A read only ROS parameter descriptor"""
+
     def __init__(self, *args, **kwargs):
         """Class initializer
 
@@ -79,6 +99,10 @@ class PoseNode(Node):
         """
         super().__init__(*args, **kwargs)
         self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if self._device.type == "cuda":
+            # Allow TensorFloat-32 tensor cores for float32 matrix multiplications
+            # in the matcher that are not already run in reduced precision
+            torch.set_float32_matmul_precision("high")
 
         self._cv_bridge = CvBridge()
 
@@ -114,6 +138,8 @@ class PoseNode(Node):
                         "filter_threshold": self.CONFIDENCE_THRESHOLD,
                         "depth_confidence": -1,
                         "width_confidence": -1,
+                        # Run in mixed precision (FP16) on GPU
+                        "mp": True,
                     },
                 )
                 .to(self._device)
@@ -121,10 +147,32 @@ class PoseNode(Node):
             )
             self._extractor = cv2.SIFT_create()
 
-        self._cached_stamp_kps_desc: Optional[
-            Tuple[Time, Optional[List[cv2.KeyPoint]], np.ndarray]
+        if self._device.type == "cuda" and self.compile_matcher:
+            # The number of keypoints varies from frame to frame so we compile for
+            # dynamic input shapes to avoid recompiling on every frame
+            self._matcher = torch.compile(self._matcher, dynamic=True)
+
+        # Run mixed precision matching in bfloat16 where supported: it has the
+        # same dynamic range as float32 so attention logits cannot overflow like
+        # they can in float16. The matcher's own autocast inherits this dtype.
+        self._matcher_bf16 = (
+            self._device.type == "cuda" and torch.cuda.is_bf16_supported()
+        )
+
+        # Reference image keypoint coordinates on the host and features (local
+        # affine frames and descriptors) on the device, keyed by reference image
+        # timestamp
+        self._cached_stamp_lafs_desc: Optional[
+            Tuple[Time, np.ndarray, torch.Tensor, torch.Tensor]
         ] = None
 
+        # Page-locked host staging buffer and a dedicated CUDA stream for copying
+        # query keypoints to the GPU asynchronously, the buffer is grown on demand
+        self._pinned_keypoints: Optional[torch.Tensor] = None
+        self._copy_stream: Optional[torch.cuda.Stream] = (
+            torch.cuda.Stream() if self._device.type == "cuda" else None
+        )
+
         # initialize subscriptions
         self.camera_info
         self.pose_image
@@ -150,6 +198,11 @@ class PoseNode(Node):
             Image, ROS_TOPIC_RELATIVE_POSITION_IMAGE, 10
         )
 
+        # Draw and publish dev images in a background thread
+        self._visualization_worker = BackgroundWorker(
+            "pose_node_visualization", self.get_logger()
+        )
+
         # Deep matching can be very slow when running on CPU so we need to keep
         # transformations in a buffer for a long time
         self._tf_buffer = tf2_ros.Buffer(rclpy.duration.Duration(seconds=30))
@@ -161,6 +214,118 @@ class PoseNode(Node):
             tf2_ros.static_transform_broadcaster.StaticTransformBroadcaster(self)
         )
 
+        # The earth to gisnav_map transform is static and broadcast by this node,
+        # so it only needs to be looked up from the tf buffer once
+        self._cached_gisnav_map_to_earth: Optional[TransformStamped] = None
+
+        # Timestamp of the last reference image that was rejected as featureless,
+        # frames with the same reference image are skipped without checking again
+        self._rejected_reference_stamp: Optional[Time] = None
+
+    @property
+    @ROS.parameter(ROS_D_COMPILE_MATCHER, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def compile_matcher(self) -> Optional[bool]:
+        """ROS parameter for compiling the keypoint matcher with :func:`torch.compile`
+        when running on GPU
+
+        Reduces per-frame matching overhead at the cost of slow initial matches while
+        the matcher is being compiled.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MIN_REFERENCE_TEXTURE)
+    def min_reference_texture(self) -> Optional[float]:
+        """ROS parameter for the minimum variance of the Laplacian of the reference
+        image before attempting matching
+
+        Low variance indicates a blurry or featureless reference image.
+        """
+
+    def _upload_keypoints(
+        self, keypoints: np.ndarray, non_blocking: bool = False
+    ) -> torch.Tensor:
+        """Copies keypoints to :attr:`._device`
+
+        :param keypoints: Keypoints as 2D float32 array with rows laid out
+            as in :data:`.KEYPOINT_DTYPE`
+        :param non_blocking: Set to True to copy the keypoints to a CUDA device
+            asynchronously on :attr:`._copy_stream` via :attr:`._pinned_keypoints`.
+            The current stream must wait for :attr:`._copy_stream` before the
+            returned tensor is used.
+        :return: Keypoints tensor on :attr:`._device`
+        """
+        if non_blocking and self._copy_stream is not None:
+            # The staging buffer is reused, make sure the previous copy from it
+            # has completed before overwriting it
+            self._copy_stream.synchronize()
+            if (
+                self._pinned_keypoints is None
+                or self._pinned_keypoints.shape[0] < keypoints.shape[0]
+                or self._pinned_keypoints.shape[1] != keypoints.shape[1]
+            ):
+                self._pinned_keypoints = torch.empty(
+                    (2 * keypoints.shape[0], keypoints.shape[1]),
+                    dtype=torch.float32,
+                    pin_memory=True,
+                )
+            pinned = self._pinned_keypoints[: keypoints.shape[0]]
+            np.copyto(pinned.numpy(), keypoints)
+            with torch.cuda.stream(self._copy_stream):
+                return pinned.to(self._device, non_blocking=True)
+
+        return torch.from_numpy(keypoints).to(self._device)
+
+    def _to_lafs_and_descriptors(
+        self, keypoints_tensor: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Returns local affine frames (LAFs) and RootSIFT descriptors of keypoints
+
+        :param keypoints_tensor: Keypoints as 2D float32 tensor with rows laid out
+            as in :data:`.KEYPOINT_DTYPE`
+        :return: Tuple of LAFs and RootSIFT descriptors on :attr:`._device`
+        """
+        lafs = laf_from_center_scale_ori(
+            keypoints_tensor[None, :, 0:2],
+            keypoints_tensor[None, :, 3, None, None],
+            keypoints_tensor[None, :, 4, None],
+        )
+
+        # Convert to RootSIFT (required by kornia LightGlueMatcher)
+        descs = torch.nn.functional.normalize(
+            keypoints_tensor[:, 5:], dim=-1, p=1
+        ).sqrt()
+
+        return lafs, descs
+
+    def _publish_matches_image(
+        self,
+        camera_info: CameraInfo,
+        ref: np.ndarray,
+        mkp_qry: np.ndarray,
+        mkp_ref: np.ndarray,
+        r: np.ndarray,
+        t: np.ndarray,
+        stamp: Time,
+    ) -> None:
+        """Draws and publishes keypoint matches and projected FOV for debugging
+
+        Runs in :attr:`._visualization_worker` background thread.
+        """
+        # TODO: include query image in OrthoStereoImage message to enable
+        #  this visualization, now we only have SIFT features
+        match_img = visualize_matches_and_pose(
+            camera_info,
+            np.zeros_like(ref),  # todo query image here
+            ref.copy(),
+            mkp_qry,
+            mkp_ref,
+            r,
+            t,
+        )
+        ros_match_image = self._cv_bridge.cv2_to_imgmsg(match_img)
+        ros_match_image.header.stamp = stamp
+        self._matches_publisher.publish(ros_match_image)
+
     def _set_initial_pose(self, pose):
         if not self._pose_sent:
             self._set_pose_request.pose = pose
@@ -197,239 +362,277 @@ class PoseNode(Node):
         with and complement the continous or smooth twist estimate obtained via
         shallow matching or visual odometry (VO).
         """
+        return self._pose(self.camera_info, self.pose_image)
+
+    @narrow_types
+    def _pose(
+        self,
+        camera_info: CameraInfo,
+        msg: OrthoStereoImage,
+    ) -> Optional[PoseWithCovarianceStamped]:
+        # The reference image was already found to be featureless
+        if msg.reference.header.stamp == self._rejected_reference_stamp:
+            return None
+
+        # Get the point cloud data as a numpy array. All KEYPOINT_DTYPE fields
+        # are float32 so we can view the records as rows of a 2D array and
+        # copy them to the device in one go instead of field by field.
+        # TODO: insert z/depth coordinates from elsewhere?
+        data = np.frombuffer(msg.query_sift.data, dtype=np.float32).reshape(
+            -1, KEYPOINT_DTYPE.itemsize // np.dtype(np.float32).itemsize
+        )
 
-        @narrow_types(self)
-        def _pose(
-            camera_info: CameraInfo,
-            msg: OrthoStereoImage,
-        ) -> Optional[PoseWithCovarianceStamped]:
-            # Get the point cloud data as a numpy array
-            data = np.frombuffer(msg.query_sift.data, dtype=KEYPOINT_DTYPE)
-
-            # TODO: insert z/depth coordinates from elsewhere?
-            kp_qry_cv2 = np.column_stack((data["x"], data["y"]))
-            descs_qry_cv2 = data["descriptor"]
-            kp_qry_cv2_size = data["size"]
-            kp_qry_cv2_angle = data["angle"]
-
-            # Convert the ROS Image message to an OpenCV image
-            ref = self._cv_bridge.imgmsg_to_cv2(msg.reference, desired_encoding="mono8")
-            assert ref.ndim == 2 or ref.shape[2] == 1
-
-            # reference_img = cv2.cvtColor(reference_img, cv2.COLOR_BGR2GRAY)
-            # TODO: Support 16-bit elevation
-            reference_elevation = self._cv_bridge.imgmsg_to_cv2(
-                msg.dem, desired_encoding="mono8"
-            )
-
-            kp_ref_cv2_orig: Optional[List[cv2.KeyPoint]] = None
-            if self._cached_stamp_kps_desc is None or not rclpy.time.Time.from_msg(
-                msg.reference.header.stamp
-            ) == rclpy.time.Time.from_msg(self._cached_stamp_kps_desc[0]):
-                # reference image has a new timestamp, let's recompute features
-                kp_ref_cv2_orig, descs_ref_cv2 = self._extractor.detectAndCompute(
-                    ref, None
-                )
-                # TODO handle kp_ref_cv2_orig is None
-                self._cached_stamp_kps_desc = (
-                    msg.reference.header.stamp,
-                    kp_ref_cv2_orig,
-                    descs_ref_cv2,
-                )
-            else:
-                # Use cached reference image features
-                _, kp_ref_cv2_orig, descs_ref_cv2 = self._cached_stamp_kps_desc
+        # Start copying query keypoints to the device early so that the copy
+        # overlaps with decoding (and possibly extracting features from) the
+        # reference image on the CPU
+        keypoints_qry = self._upload_keypoints(data, non_blocking=True)
+
+        # Convert the ROS Image message to an OpenCV image
+        ref = image_to_mono8(msg.reference, self._cv_bridge)
+
+        # reference_img = cv2.cvtColor(reference_img, cv2.COLOR_BGR2GRAY)
+        # Zero-copy view of 8-bit or 16-bit elevation
+        reference_elevation = image_to_array(msg.dem)
+
+        # Compare stamp messages directly (field by field) instead of
+        # constructing rclpy Time objects on every frame
+        if (
+            self._cached_stamp_lafs_desc is None
+            or msg.reference.header.stamp != self._cached_stamp_lafs_desc[0]
+        ):
+            # Skip matching against featureless reference images (e.g. water or
+            # fields), these are unlikely to produce enough good matches.
+            # The rejected reference image timestamp is stored so that the
+            # check is not repeated until a new reference image is received.
+            min_reference_texture = self.min_reference_texture
+            if min_reference_texture is not None:
+                texture = cv2.Laplacian(ref, cv2.CV_32F).var()
+                if texture < min_reference_texture:
+                    self.get_logger().warning(
+                        f"Reference image texture ({texture:.1f}) below threshold "
+                        f"{min_reference_texture} - skipping matching"
+                    )
+                    self._rejected_reference_stamp = msg.reference.header.stamp
+                    return None
 
+            # reference image has a new timestamp, let's recompute features
+            kp_ref_cv2_orig, descs_ref_cv2 = self._extractor.detectAndCompute(ref, None)
+            # TODO handle kp_ref_cv2_orig is None
             assert kp_ref_cv2_orig is not None
-            kp_ref_cv2 = cv2.KeyPoint_convert(kp_ref_cv2_orig)
 
-            with torch.inference_mode():
-                kp_ref_cv2_size = np.array(
-                    tuple(map(lambda kp: kp.size, kp_ref_cv2_orig)), dtype=np.float32
-                )
-                kp_ref_cv2_angle = np.array(
-                    tuple(map(lambda kp: kp.angle, kp_ref_cv2_orig)), dtype=np.float32
-                )
+            # Pack reference features in the same row layout as the query
+            # keypoints so that they can also be copied to the device in one go
+            ref_data = np.empty((len(kp_ref_cv2_orig), data.shape[1]), dtype=np.float32)
+            ref_data[:, 0:2] = cv2.KeyPoint_convert(kp_ref_cv2_orig)
+            ref_data[:, 2] = 0.0
+            ref_data[:, 3] = np.fromiter(
+                (kp.size for kp in kp_ref_cv2_orig),
+                dtype=np.float32,
+                count=len(kp_ref_cv2_orig),
+            )
+            ref_data[:, 4] = np.fromiter(
+                (kp.angle for kp in kp_ref_cv2_orig),
+                dtype=np.float32,
+                count=len(kp_ref_cv2_orig),
+            )
+            ref_data[:, 5:] = descs_ref_cv2
+            kp_ref = ref_data[:, 0:2]
 
-                kp_qry_cv2, descs_qry_cv2, kp_qry_cv2_size, kp_qry_cv2_angle = tuple(
-                    map(
-                        lambda arr: torch.from_numpy(arr).to(self._device),
-                        (kp_qry_cv2, descs_qry_cv2, kp_qry_cv2_size, kp_qry_cv2_angle),
-                    )
-                )
-                kp_ref_cv2, descs_ref_cv2, kp_ref_cv2_size, kp_ref_cv2_angle = tuple(
-                    map(
-                        lambda arr: torch.from_numpy(arr).to(self._device),
-                        (kp_ref_cv2, descs_ref_cv2, kp_ref_cv2_size, kp_ref_cv2_angle),
-                    )
+            # Keep the reference features resident on the device until the
+            # reference image changes
+            with torch.inference_mode():
+                lafs_ref_cv2, descs_ref_cv2 = self._to_lafs_and_descriptors(
+                    self._upload_keypoints(ref_data)
                 )
+            self._cached_stamp_lafs_desc = (
+                msg.reference.header.stamp,
+                kp_ref,
+                lafs_ref_cv2,
+                descs_ref_cv2,
+            )
+        else:
+            # Use cached reference image features
+            _, kp_ref, lafs_ref_cv2, descs_ref_cv2 = self._cached_stamp_lafs_desc
+
+        with torch.inference_mode(), torch.autocast(
+            "cuda", dtype=torch.bfloat16, enabled=self._matcher_bf16
+        ):
+            if self._copy_stream is not None:
+                current_stream = torch.cuda.current_stream()
+                current_stream.wait_stream(self._copy_stream)
+                keypoints_qry.record_stream(current_stream)
+            lafs_qry_cv2, descs_qry_cv2 = self._to_lafs_and_descriptors(keypoints_qry)
+
+            # LightGlueMatcher returns match confidence scores (higher is
+            # better) as its "distances". Image sizes are static so we pass
+            # them explicitly instead of letting the matcher infer them from
+            # the keypoint coordinates on every call.
+            scores, match_indices = self._matcher(
+                descs_qry_cv2,
+                descs_ref_cv2,
+                lafs_qry_cv2,
+                lafs_ref_cv2,
+                hw1=(camera_info.height, camera_info.width),
+                hw2=ref.shape[:2],
+            )
 
-                lafs_qry_cv2 = laf_from_center_scale_ori(
-                    kp_qry_cv2.unsqueeze(0),
-                    kp_qry_cv2_size[None, :, None, None],
-                    kp_qry_cv2_angle[None, :, None],
-                )
-                lafs_ref_cv2 = laf_from_center_scale_ori(
-                    kp_ref_cv2.unsqueeze(0),
-                    kp_ref_cv2_size[None, :, None, None],
-                    kp_ref_cv2_angle[None, :, None],
-                )
+            # Cap the number of matches to the best ones on the device to
+            # bound the amount of data copied back and the PnP RANSAC cost
+            if len(match_indices) > self.MAX_MATCHES:
+                _, top_indices = torch.topk(scores.squeeze(-1), self.MAX_MATCHES)
+                match_indices = match_indices[top_indices]
 
-                # Convert to RootSIFT (required by kornia LightGlueMatcher)
-                descs_qry_cv2 = torch.nn.functional.normalize(
-                    descs_qry_cv2, dim=-1, p=1
-                ).sqrt()
-                descs_ref_cv2 = torch.nn.functional.normalize(
-                    descs_ref_cv2, dim=-1, p=1
-                ).sqrt()
-                dists, match_indices = self._matcher(
-                    descs_qry_cv2, descs_ref_cv2, lafs_qry_cv2, lafs_ref_cv2
-                )
+            # Artificially increase matching time (simulate CPU or resource
+            # constrained device)
+            # time.sleep(5)
 
-                kp_qry = get_laf_center(lafs_qry_cv2).squeeze()
-                kp_ref = get_laf_center(lafs_ref_cv2).squeeze()
+            # Only the match indices need to be copied back from the device,
+            # the keypoint coordinates are already available on the host
+            match_indices = match_indices.cpu().numpy()
 
-                # Artificially increase matching time (simulate CPU or resource
-                # constrained device)
-                # time.sleep(5)
+        mkp_qry = data[match_indices[:, 0], 0:2]
+        mkp_ref = kp_ref[match_indices[:, 1]]
 
-                mkp_qry = kp_qry[match_indices[:, 0]].cpu().numpy()
-                mkp_ref = kp_ref[match_indices[:, 1]].cpu().numpy()
-
-            if len(mkp_qry) < self.MIN_MATCHES:
-                self.get_logger().warning(
-                    f"Not enough matches ({len(mkp_qry)})- returning None"
-                )
-                return None
+        if len(mkp_qry) < self.MIN_MATCHES:
+            self.get_logger().warning(
+                f"Not enough matches ({len(mkp_qry)})- returning None"
+            )
+            return None
 
-            pose = compute_pose(camera_info, mkp_qry, mkp_ref, reference_elevation)
-            if pose is None:
-                return None
-            r, t = pose
+        pose = compute_pose(camera_info, mkp_qry, mkp_ref, reference_elevation)
+        if pose is None:
+            return None
+        r, t = pose
 
-            # VISUALIZE
-            # TODO: include query image in OrthoStereoImage message to enable
-            #  this visualization, now we only have SIFT features
-            match_img = visualize_matches_and_pose(
+        # VISUALIZE
+        # Debug images are only drawn if someone is listening
+        if self._matches_publisher.get_subscription_count() > 0:
+            # TODO redundant timestamp logic below
+            if msg.query.header.stamp.sec == 0:
+                # query image is likely empty and we are using keypoints
+                # isntead, get timestamp from keypoints
+                match_image_stamp = msg.query_sift.header.stamp
+            else:
+                match_image_stamp = msg.query.header.stamp
+            self._visualization_worker.submit(
+                self._publish_matches_image,
                 camera_info,
-                np.zeros_like(ref),  # todo query image here
-                ref.copy(),
+                ref,
                 mkp_qry,
                 mkp_ref,
                 r,
                 t,
+                match_image_stamp,
             )
-            ros_match_image = self._cv_bridge.cv2_to_imgmsg(match_img)
-            # TODO redundant timestamp logic below
-            if msg.query.header.stamp.sec == 0:
-                # query image is likely empty and we are using keypoints isntead,
-                # get timestamp from keypoints
-                ros_match_image.header.stamp = msg.query_sift.header.stamp
-            else:
-                ros_match_image.header.stamp = msg.query.header.stamp
-            self._matches_publisher.publish(ros_match_image)
-            # END VISUALIZE
+        # END VISUALIZE
 
-            r_inv = r.T
-            camera_optical_position_in_world = -r_inv @ t
+        r_inv = r.T
+        camera_optical_position_in_world = -r_inv @ t
 
-            # Publish camera position in world frame to ROS for debugging
-            x, y = camera_optical_position_in_world[0:2].squeeze().tolist()
-            x, y = int(x), int(y)
+        # Publish camera position in world frame to ROS for debugging
+        x, y = camera_optical_position_in_world[0:2].squeeze().tolist()
+        x, y = int(x), int(y)
 
-            if not (0 <= x <= ref.shape[0] and 0 <= y <= ref.shape[1]):
-                self.get_logger().warning(f"center {(x, y)} was not in expected range")
-                return None
+        if not (0 <= x <= ref.shape[0] and 0 <= y <= ref.shape[1]):
+            self.get_logger().warning(f"center {(x, y)} was not in expected range")
+            return None
 
-            image = cv2.circle(np.array(ref.copy()), (x, y), 5, (0, 255, 0), -1)
+        if self._position_publisher.get_subscription_count() > 0:
+            image = cv2.circle(ref.copy(), (x, y), 5, (0, 255, 0), -1)
             ros_image = self._cv_bridge.cv2_to_imgmsg(image)
             self._position_publisher.publish(ros_image)
 
-            pose = tf_.create_pose_msg(
-                msg.query.header.stamp,
-                cast(FrameID, "earth"),
-                r_inv,
-                camera_optical_position_in_world,
-            )
-            if pose is None:
-                self.get_logger().warning("Could not create pose msg - returning None")
-                # TODO: handle better
-                return None
-
-            affine = tf_.proj_to_affine(msg.crs.data)
-
-            t_wgs84 = affine @ np.append(camera_optical_position_in_world, 1)
-            x, y, z = tf_.wgs84_to_ecef(*t_wgs84.tolist())
-            pose.pose.position.x = x
-            pose.pose.position.y = y
-            pose.pose.position.z = z
-
-            # Get rotation matrix from world frame to ENU map_gisnav frame - this
-            # should only be a rotation around the yaw (and a flip of z axis and sign
-            # of rotation, since map_gisnav is ENU while world frame is right-down-
-            # forward which projected to ground means ESD)
-            R = affine[:3, :3]
-            R = R / np.linalg.norm(R, axis=0)
-
-            camera_optical_rotation_in_enu = R @ r_inv
+        pose = tf_.create_pose_msg(
+            msg.query.header.stamp,
+            cast(FrameID, "earth"),
+            r_inv,
+            camera_optical_position_in_world,
+        )
+        if pose is None:
+            self.get_logger().warning("Could not create pose msg - returning None")
+            # TODO: handle better
+            return None
+
+        affine = tf_.proj_to_affine(msg.crs.data)
+
+        t_wgs84 = affine @ np.append(camera_optical_position_in_world, 1)
+        x, y, z = tf_.wgs84_to_ecef(*t_wgs84.tolist())
+        pose.pose.position.x = x
+        pose.pose.position.y = y
+        pose.pose.position.z = z
+
+        # Get rotation matrix from world frame to ENU map_gisnav frame - this
+        # should only be a rotation around the yaw (and a flip of z axis and sign
+        # of rotation, since map_gisnav is ENU while world frame is right-down-
+        # forward which projected to ground means ESD)
+        R = affine[:3, :3]
+        R = R / np.linalg.norm(R, axis=0)
+
+        camera_optical_rotation_in_enu = R @ r_inv
+
+        r_ecef = (
+            tf_.enu_to_ecef_matrix(t_wgs84[0], t_wgs84[1])
+            @ camera_optical_rotation_in_enu
+        )
 
-            r_ecef = np.eye(4)
-            r_ecef[:3, :3] = tf_.enu_to_ecef_matrix(t_wgs84[0], t_wgs84[1])
-            r_ecef[:3, :3] = r_ecef[:3, :3] @ camera_optical_rotation_in_enu
+        q = tf_.quaternion_from_rotation_matrix(r_ecef)
+        pose.pose.orientation = tf_.as_ros_quaternion(q)
 
-            q = tf_transformations.quaternion_from_matrix(r_ecef)
-            pose.pose.orientation = tf_.as_ros_quaternion(np.array(q))
+        # todo add functions for transforms arithmetic and clean up this whole
+        #  section
+        earth_to_gisnav_camera_optical = tf_.pose_to_transform(
+            pose, "gisnav_camera_link_optical"
+        )
 
-            # todo add functions for transforms arithmetic and clean up this whole
-            #  section
-            earth_to_gisnav_camera_optical = tf_.pose_to_transform(
-                pose, "gisnav_camera_link_optical"
+        if self._tf_buffer.can_transform(
+            "gisnav_camera_link_optical", "gisnav_odom", rclpy.time.Time()
+        ):
+            query_time = rclpy.time.Time(
+                seconds=msg.query.header.stamp.sec,
+                nanoseconds=msg.query.header.stamp.nanosec,
             )
 
-            if self._tf_buffer.can_transform(
-                "gisnav_camera_link_optical", "gisnav_odom", rclpy.time.Time()
+            if (
+                self._cached_gisnav_map_to_earth is None
+                and not self._tf_buffer.can_transform("earth", "gisnav_map", query_time)
             ):
-                query_time = rclpy.time.Time(
-                    seconds=msg.query.header.stamp.sec,
-                    nanoseconds=msg.query.header.stamp.nanosec,
-                )
-
-                if not self._tf_buffer.can_transform("earth", "gisnav_map", query_time):
-                    try:
-                        camera_optical_to_map = self._tf_buffer.lookup_transform(
-                            "camera_optical",
-                            "map",
-                            query_time,
-                            rclpy.duration.Duration(seconds=0.1),
-                        )
-                    except (
-                        tf2_ros.LookupException,
-                        tf2_ros.ConnectivityException,
-                        tf2_ros.ExtrapolationException,
-                    ) as e:
-                        self.get_logger().warning(
-                            f"Could not transform from camera_optical to "
-                            f"map. Skipping publishing pose. {e}"
-                        )
-                        return None
-
-                    # Put gisnav_map roughly where (mavros_)map is, this should make it
-                    # ENU and thereby comply with REP 105. Assumes current
-                    # camera_optical to map transform from FCU via MAVROS is
-                    # sufficiently correct
-                    # TODO: implement without assumption FCU EKF has correct state
-                    #  estimate?
-                    earth_to_gisnav_map = tf_.add_transform_stamped(
-                        earth_to_gisnav_camera_optical, camera_optical_to_map
+                try:
+                    camera_optical_to_map = self._tf_buffer.lookup_transform(
+                        "camera_optical",
+                        "map",
+                        query_time,
+                        rclpy.duration.Duration(seconds=0.1),
+                    )
+                except (
+                    tf2_ros.LookupException,
+                    tf2_ros.ConnectivityException,
+                    tf2_ros.ExtrapolationException,
+                ) as e:
+                    self.get_logger().warning(
+                        f"Could not transform from camera_optical to "
+                        f"map. Skipping publishing pose. {e}"
                     )
-                    earth_to_gisnav_map.header.frame_id = "earth"
-                    earth_to_gisnav_map.child_frame_id = "gisnav_map"
-                    self._tf_static_broadcaster.sendTransform([earth_to_gisnav_map])
-
-                    # TODO implement better, no need to return None here, we can publish
                     return None
 
-                # TODO: this is earth to map
+                # Put gisnav_map roughly where (mavros_)map is, this should make it
+                # ENU and thereby comply with REP 105. Assumes current
+                # camera_optical to map transform from FCU via MAVROS is
+                # sufficiently correct
+                # TODO: implement without assumption FCU EKF has correct state
+                #  estimate?
+                earth_to_gisnav_map = tf_.add_transform_stamped(
+                    earth_to_gisnav_camera_optical, camera_optical_to_map
+                )
+                earth_to_gisnav_map.header.frame_id = "earth"
+                earth_to_gisnav_map.child_frame_id = "gisnav_map"
+                self._tf_static_broadcaster.sendTransform([earth_to_gisnav_map])
+
+                # TODO implement better, no need to return None here, we can publish
+                return None
+
+            # TODO: this is earth to map
+            gisnav_map_to_earth = self._cached_gisnav_map_to_earth
+            if gisnav_map_to_earth is None:
                 gisnav_map_to_earth = tf_.lookup_transform(
                     self._tf_buffer,
                     "gisnav_map",
@@ -437,64 +640,63 @@ class PoseNode(Node):
                     (msg.query.header.stamp, rclpy.duration.Duration(seconds=0.2)),
                     self.get_logger(),
                 )
-                # TODO: this is base_link to camera_link_optical
-                gisnav_camera_optical_to_base_link = tf_.lookup_transform(
-                    self._tf_buffer,
-                    "gisnav_camera_link_optical",
-                    "gisnav_base_link",
-                    (msg.query.header.stamp, rclpy.duration.Duration(seconds=0.2)),
-                    self.get_logger(),
-                )
-                if (
-                    gisnav_map_to_earth is None
-                    or gisnav_camera_optical_to_base_link is None
-                ):
-                    self.get_logger().warning(
-                        "Could not transform from gisnav_camera_link_optical to "
-                        "gisnav_base_link. Skipping publishing pose."
-                    )
-                    return None
-
-                gisnav_map_to_camera_link_optical = tf_.add_transform_stamped(
-                    gisnav_map_to_earth, earth_to_gisnav_camera_optical
-                )
-                gisnav_map_to_base_link = tf_.add_transform_stamped(
-                    gisnav_map_to_camera_link_optical,
-                    gisnav_camera_optical_to_base_link,
-                )
-
-                pose_msg = tf_.transform_to_pose(gisnav_map_to_base_link)
-                pose_msg.header.frame_id = "gisnav_map"
-            else:
-                self.get_logger().debug(
-                    "Odom frame likely not yet initialized, skpping publishing global "
-                    "pose"
+                self._cached_gisnav_map_to_earth = gisnav_map_to_earth
+            # TODO: this is base_link to camera_link_optical
+            gisnav_camera_optical_to_base_link = tf_.lookup_transform(
+                self._tf_buffer,
+                "gisnav_camera_link_optical",
+                "gisnav_base_link",
+                (msg.query.header.stamp, rclpy.duration.Duration(seconds=0.2)),
+                self.get_logger(),
+            )
+            if (
+                gisnav_map_to_earth is None
+                or gisnav_camera_optical_to_base_link is None
+            ):
+                self.get_logger().warning(
+                    "Could not transform from gisnav_camera_link_optical to "
+                    "gisnav_base_link. Skipping publishing pose."
                 )
                 return None
 
-            assert pose_msg is not None
-
-            # TODO: re-enable covariance/implement error model
-            pose_with_covariance = PoseWithCovariance(
-                pose=pose_msg.pose  # , covariance=COVARIANCE_LIST_GLOBAL
+            gisnav_map_to_camera_link_optical = tf_.add_transform_stamped(
+                gisnav_map_to_earth, earth_to_gisnav_camera_optical
+            )
+            gisnav_map_to_base_link = tf_.add_transform_stamped(
+                gisnav_map_to_camera_link_optical,
+                gisnav_camera_optical_to_base_link,
             )
 
-            pose_with_covariance = PoseWithCovarianceStamped(
-                header=pose_msg.header, pose=pose_with_covariance
+            pose_msg = tf_.transform_to_pose(gisnav_map_to_base_link)
+            pose_msg.header.frame_id = "gisnav_map"
+        else:
+            self.get_logger().debug(
+                "Odom frame likely not yet initialized, skpping publishing global "
+                "pose"
             )
+            return None
 
-            # Pose should have the query image timestamp
-            # TODO: handle this in a less brittle way
-            if msg.query.header.stamp.sec == 0:
-                # query image is likely empty and we are using keypoints isntead,
-                # get timestamp from keypoints
-                pose_with_covariance.header.stamp = msg.query_sift.header.stamp
-            else:
-                pose_with_covariance.header.stamp = msg.query.header.stamp
+        assert pose_msg is not None
+
+        # TODO: re-enable covariance/implement error model
+        pose_with_covariance = PoseWithCovariance(
+            pose=pose_msg.pose  # , covariance=COVARIANCE_LIST_GLOBAL
+        )
 
-            return pose_with_covariance
+        pose_with_covariance = PoseWithCovarianceStamped(
+            header=pose_msg.header, pose=pose_with_covariance
+        )
+
+        # Pose should have the query image timestamp
+        # TODO: handle this in a less brittle way
+        if msg.query.header.stamp.sec == 0:
+            # query image is likely empty and we are using keypoints isntead,
+            # get timestamp from keypoints
+            pose_with_covariance.header.stamp = msg.query_sift.header.stamp
+        else:
+            pose_with_covariance.header.stamp = msg.query.header.stamp
 
-        return _pose(self.camera_info, self.pose_image)
+        return pose_with_covariance
 
     @property
     @ROS.subscribe(
@@ -502,6 +704,7 @@ class PoseNode(Node):
         f'/{ROS_TOPIC_RELATIVE_POSE_IMAGE.replace("~", STEREO_NODE_NAME)}',
         QoSPresetProfiles.SENSOR_DATA.value,
         callback=_pose_image_cb,
+        callback_group=MutuallyExclusiveCallbackGroup,
     )
     def pose_image(self) -> Optional[OrthoStereoImage]:
         """Aligned and cropped query, reference, DEM rasters from
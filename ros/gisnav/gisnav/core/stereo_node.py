@@ -9,20 +9,21 @@ reference orthoimage by using information of the onboard camera resolution and t
 vehicle's heading. Alignment  is required since the deep learning network that is used
 for matching keypoints is not assumed to be rotation agnostic.
 """
-from typing import Final, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Final, Optional, Tuple
 
 import cv2
 import numpy as np
 import rclpy
 import tf2_ros
-import tf_transformations
+from builtin_interfaces.msg import Time
 from cv_bridge import CvBridge
-from geometry_msgs.msg import TransformStamped
 from gisnav_msgs.msg import OrthoImage, OrthoStereoImage  # type: ignore[attr-defined]
 from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
-from sensor_msgs.msg import CameraInfo, PointCloud2
+from sensor_msgs.msg import CameraInfo, Image, PointCloud2
 from std_msgs.msg import String
 
 from .. import _transformations as tf_
@@ -36,6 +37,12 @@ from ..constants import (
     ROS_TOPIC_RELATIVE_QUERY_KEYPOINTS,
     TWIST_NODE_NAME,
 )
+from ._shared import (
+    LATEST_STATE_QOS,
+    array_to_image,
+    image_to_array,
+    image_to_mono8,
+)
 
 
 class StereoNode(Node):
@@ -44,6 +51,9 @@ class StereoNode(Node):
     _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
     """A read only ROS parameter descriptor"""
 
+    ROS_D_MIN_MATCH_ALTITUDE = 0.0
+    """Default value for :attr:`.min_match_altitude`"""
+
     _MAP_ROTATION_INTERVAL: Final = 45
     """Interval in degrees at which keypoints are computed and cached for reference
     map rasters. Default for :attr:`map_rotation_interval`.
@@ -54,6 +64,11 @@ class StereoNode(Node):
     images that would need to be handled by additional custom logic.
     """
 
+    _XY_SWAP: Final = np.array(
+        [[0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float64
+    )
+    """Homogenous matrix that swaps the x and y axes"""
+
     def __init__(self, *args, **kwargs) -> None:
         """Class initializer
 
@@ -79,23 +94,63 @@ class StereoNode(Node):
         self._tf_buffer = tf2_ros.Buffer()
         self._tf_listener = tf2_ros.TransformListener(self._tf_buffer, self)
 
-        # Previous rotation is integer, not float, because we want to have the rotations
-        # in discrete buckets so that we can cache keypoints per rotation bucket
-        self._previous_map_rotation: Optional[int] = None
-        self._pose_image: Optional[OrthoStereoImage] = None
+        # Rotated and cropped reference image and DEM messages and the reference
+        # CRS for the current orthoimage, keyed by rotation bucket and crop shape.
+        # Rotation is integer, not float, because we want to have the rotations in
+        # discrete buckets so that we can cache them per rotation bucket
+        self._warp_cache: Dict[Tuple[int, Tuple[int, int]], Tuple[Image, Image, str]]
+        self._warp_cache = {}
+
+        # Grayscale reference and DEM planes of the current orthoimage, decoded
+        # once per orthoimage instead of once per rotation bucket
+        self._orthoimage_stamp: Optional[Time] = None
+        self._reference_plane: Optional[np.ndarray] = None
+        self._dem_plane: Optional[np.ndarray] = None
+
+        # Stamp of the last processed keypoints, used to skip redelivered messages
+        self._keypoints_stamp: Optional[Time] = None
+
+        # Reused output buffers for the rotated and cropped reference image and
+        # DEM (the published messages hold copies of the data)
+        self._reference_warp_out: Optional[np.ndarray] = None
+        self._dem_warp_out: Optional[np.ndarray] = None
+
+        # The DEM is warped on this executor concurrently with the reference image,
+        # OpenCV releases the GIL so the two warps overlap
+        self._warp_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="stereo_node_warp"
+        )
+
+        # Reused reference image and DEM messages per rotation bucket, these
+        # outlive the warp cache so that their data buffers can be overwritten
+        # when a new orthoimage is received
+        self._warp_msgs: Dict[Tuple[int, Tuple[int, int]], Tuple[Image, Image]] = {}
 
     def _orthoimage_cb(self, msg: OrthoImage) -> None:
-        # TODO: rotation and pose image should be cached atomically
-        if self._pose_image is None or (
-            rclpy.time.Time.from_msg(msg.image.header.stamp)
-            != rclpy.time.Time.from_msg(self._pose_image.reference.header.stamp)
+        """Callback for :attr:`.orthoimage` message"""
+        if (
+            self._orthoimage_stamp is None
+            or msg.image.header.stamp != self._orthoimage_stamp
         ):
-            # Set cached rotation to None to trigger rotation and cropping on
-            # new reference orthoimages. But only if the new orthoimage has a different
+            # Clear the warp cache to trigger rotation and cropping on new
+            # reference orthoimages. But only if the new orthoimage has a different
             # timestamp (it could be the same one we are already using, in which case
             # we do not want to reset cache)
-            self._previous_map_rotation = None
-            self._pose_image = None
+            self._warp_cache.clear()
+
+            # Zero-copy view of the DEM, the orthoimage is converted to grayscale
+            # (color not needed)
+            dem = image_to_mono8(msg.dem, self._cv_bridge)
+            # TODO: make dem 16 bit
+            assert dem.ndim == 2, (
+                f"DEM had shape {dem.shape} when a single 8-bit elevation "
+                f"channel was expected"
+            )
+            self._reference_plane = cv2.cvtColor(
+                image_to_array(msg.image), cv2.COLOR_BGR2GRAY
+            )
+            self._dem_plane = dem
+            self._orthoimage_stamp = msg.image.header.stamp
 
     @property
     @ROS.subscribe(
@@ -117,8 +172,22 @@ class StereoNode(Node):
         """Subscribed camera info for determining appropriate :attr:`.orthoimage` crop
         resolution, or None if unknown"""
 
+    @property
+    @ROS.parameter(ROS_D_MIN_MATCH_ALTITUDE)
+    def min_match_altitude(self) -> Optional[float]:
+        """Minimum camera altitude in meters in the ``map`` frame below which
+        :attr:`.pnp_image` is not published, since matching is not expected to
+        succeed that close to the ground. The default of 0 disables the check.
+        """
+
     def _keypoints_cb(self, msg: PointCloud2) -> None:
-        """Callback for :attr:`.image` message"""
+        """Callback for :attr:`.keypoints` message"""
+        # Skip keypoints that have already been processed, the transform lookups
+        # and the published message would be the same
+        if msg.header.stamp == self._keypoints_stamp:
+            return
+        self._keypoints_stamp = msg.header.stamp
+
         self.pnp_image(msg)
 
     @property
@@ -132,204 +201,239 @@ class StereoNode(Node):
     def keypoints(self) -> Optional[PointCloud2]:
         """Subscribed query image keypoints, or None if unknown"""
 
+    @narrow_types
     def _world_to_reference_proj_str(
         self,
         M: np.ndarray,
         crs: str,
     ) -> Optional[str]:
-        @narrow_types(self)
-        def _transform(
-            M: np.ndarray,
-            crs: str,
-        ) -> Optional[TransformStamped]:
-            # 3D version of the inverse rotation and cropping transform
-            M_3d = np.eye(4)
-            M_3d[:2, :2] = M[:2, :2]
-            M_3d[:2, 3] = M[:2, 2]
-
-            try:
-                tf_transformations.quaternion_from_matrix(M_3d)
-            except np.linalg.LinAlgError:
-                self.get_logger().warning(
-                    "_pnp_image: Could not compute quaternion from estimated rotation. "
-                    "Returning None."
-                )
-                return None
-
-            # TODO clean this up
-            M = tf_.proj_to_affine(crs)
-            # Flip x and y in between to make this transformation chain work
-            T = np.array([[0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
-            compound_transform = M @ T @ np.linalg.inv(M_3d)
-            proj_str = tf_.affine_to_proj(compound_transform)
-
-            return proj_str
-
-        return _transform(M, crs)
+        # 3D version of the inverse rotation and cropping transform (reference
+        # to orthoimage pixel coordinates)
+        M_3d = np.eye(4)
+        M_3d[:2, :2] = M[:2, :2]
+        M_3d[:2, 3] = M[:2, 2]
+
+        # TODO clean this up
+        M = tf_.proj_to_affine(crs)
+        # Flip x and y in between to make this transformation chain work
+        compound_transform = M @ self._XY_SWAP @ M_3d
+        proj_str = tf_.affine_to_proj(compound_transform)
+
+        return proj_str
 
     @ROS.publish(
         ROS_TOPIC_RELATIVE_POSE_IMAGE,
-        QoSPresetProfiles.SENSOR_DATA.value,
+        LATEST_STATE_QOS,
     )
     def pnp_image(self, keypoint_cloud: PointCloud2) -> Optional[OrthoStereoImage]:
         """Published aligned and cropped orthoimage consisting of query image,
         reference image, and optional reference elevation raster (DEM).
         """
+        return self._pnp_image(
+            self.camera_info,
+            keypoint_cloud,
+            self.orthoimage,
+        )
 
-        @narrow_types(self)
-        def _pnp_image(
-            camera_info: CameraInfo,
-            keypoint_cloud: PointCloud2,
-            orthoimage: OrthoImage,
-        ) -> Optional[OrthoStereoImage]:
-            """Rotate and crop and orthoimage stack to align with query image"""
-            query_time = rclpy.time.Time(
-                seconds=keypoint_cloud.header.stamp.sec,
-                nanoseconds=keypoint_cloud.header.stamp.nanosec,
-            )
-            transform = tf_.lookup_transform(
-                self._tf_buffer,
-                "map",
-                "camera",
-                (query_time, rclpy.duration.Duration(seconds=0.2)),
-                logger=self.get_logger(),
+    @narrow_types
+    def _pnp_image(
+        self,
+        camera_info: CameraInfo,
+        keypoint_cloud: PointCloud2,
+        orthoimage: OrthoImage,
+    ) -> Optional[OrthoStereoImage]:
+        """Rotate and crop and orthoimage stack to align with query image"""
+        query_time = rclpy.time.Time(
+            seconds=keypoint_cloud.header.stamp.sec,
+            nanoseconds=keypoint_cloud.header.stamp.nanosec,
+        )
+        transform = tf_.lookup_transform(
+            self._tf_buffer,
+            "map",
+            "camera",
+            (query_time, rclpy.duration.Duration(seconds=0.2)),
+            logger=self.get_logger(),
+        )
+        if transform is None:
+            self.get_logger().warning("Could not get map to camera transform.")
+            return None
+        else:
+            transform = transform.transform
+
+        # Skip the warp and publish entirely if the camera is too low for
+        # matching against the orthoimage
+        min_match_altitude = self.min_match_altitude
+        if (
+            min_match_altitude is not None
+            and abs(transform.translation.z) < min_match_altitude
+        ):
+            self.get_logger().debug(
+                f"Camera altitude {abs(transform.translation.z):.1f} m below minimum "
+                f"match altitude {min_match_altitude} m, skipping."
             )
-            if transform is None:
-                self.get_logger().warning("Could not get map to camera transform.")
-                return None
-            else:
-                transform = transform.transform
-
-            # Rotate and crop orthoimage stack
-            # TODO: implement this part better e.g. use
-            #  tf_transformations.euler_from_quaternion
-            camera_yaw_degrees = tf_.extract_yaw(transform.rotation)
-            camera_roll_degrees = tf_.extract_roll(transform.rotation)
-            # This is assumed to be positive clockwise when looking down nadir
-            # (z axis up in an ENU frame), z is aligned with zenith so in that sense
-            # this is positive in the counter-clockwise direction. E.g. east aligned
-            # rotation is positive 90 degrees.
-            rotation = int((camera_yaw_degrees + camera_roll_degrees) % 360)
-            map_rotation = int(
-                (
-                    (rotation + self._MAP_ROTATION_INTERVAL / 2)
-                    // self._MAP_ROTATION_INTERVAL
-                )
-                * self._MAP_ROTATION_INTERVAL
-                % 360
+            return None
+
+        # Rotate and crop orthoimage stack
+        # TODO: implement this part better e.g. use
+        #  tf_transformations.euler_from_quaternion
+        camera_yaw_degrees = tf_.extract_yaw(transform.rotation)
+        camera_roll_degrees = tf_.extract_roll(transform.rotation)
+        # This is assumed to be positive clockwise when looking down nadir
+        # (z axis up in an ENU frame), z is aligned with zenith so in that sense
+        # this is positive in the counter-clockwise direction. E.g. east aligned
+        # rotation is positive 90 degrees.
+        rotation = int((camera_yaw_degrees + camera_roll_degrees) % 360)
+        map_rotation = int(
+            (
+                (rotation + self._MAP_ROTATION_INTERVAL / 2)
+                // self._MAP_ROTATION_INTERVAL
             )
+            * self._MAP_ROTATION_INTERVAL
+            % 360
+        )
 
-            # Do not recompute/warp reference if rotation diff is less than 5 deg
-            if (
-                self._previous_map_rotation is None
-                or abs(map_rotation - self._previous_map_rotation)
-                >= self._MAP_ROTATION_INTERVAL
-            ):
-                orthoimage_arr = self._cv_bridge.imgmsg_to_cv2(
-                    orthoimage.image, desired_encoding="passthrough"
-                )
-                dem_arr = self._cv_bridge.imgmsg_to_cv2(
-                    orthoimage.dem, desired_encoding="mono8"
-                )
-                orthoimage_arr = cv2.cvtColor(orthoimage_arr, cv2.COLOR_BGR2GRAY)
-                orthoimage_stack = np.dstack((orthoimage_arr, dem_arr))
-
-                # TODO: make dem 16 bit
-                assert orthoimage_stack.shape[2] == 2, (
-                    f"Orthoimage stack channel count was {orthoimage_stack.shape[2]} "
-                    f"when 2 was expected (one channel for 8-bit grayscale reference "
-                    f"image and one 8-bit channel for 8-bit elevation reference)"
-                )
-
-                crop_shape: Tuple[int, int] = camera_info.height, camera_info.width
-
-                orthoimage_rotated_stack, M = self._rotate_and_crop_center(
-                    orthoimage_stack, map_rotation, crop_shape
-                )
-
-                reference_image_msg = self._cv_bridge.cv2_to_imgmsg(
-                    orthoimage_rotated_stack[:, :, 0], encoding="mono8"
-                )
-
-                reference_image_msg.header.stamp = keypoint_cloud.header.stamp
-                proj_str = self._world_to_reference_proj_str(
-                    np.linalg.inv(M),  # TODO: try-except
-                    orthoimage.crs.data,
-                )
-                # TODO: 16 bit DEM
-                dem_msg = self._cv_bridge.cv2_to_imgmsg(
-                    orthoimage_rotated_stack[:, :, 1], encoding="mono8"
-                )
-            else:
-                assert self._pose_image is not None
-                reference_image_msg = self._pose_image.reference
-                proj_str = self._pose_image.crs.data
-                dem_msg = self._pose_image.dem
-
-            assert reference_image_msg is not None
-            assert proj_str is not None
+        crop_shape: Tuple[int, int] = camera_info.height, camera_info.width
+
+        # Do not recompute/warp reference if this rotation bucket has already
+        # been warped for the current orthoimage
+        cache_key = (map_rotation, crop_shape)
+        cached_warp = self._warp_cache.get(cache_key)
+        if cached_warp is None:
+            # Planes are decoded in the orthoimage callback
+            orthoimage_arr = self._reference_plane
+            dem_arr = self._dem_plane
+            assert orthoimage_arr is not None and dem_arr is not None
+
+            # Rotate and crop the grayscale reference image and DEM as separate
+            # planes instead of stacking them, so that the output images need no
+            # per-channel strided copies. Use nearest neighbor interpolation for
+            # the DEM to not introduce elevation values that are not in the
+            # source raster.
+            dem_future = self._warp_executor.submit(
+                self._rotate_and_crop_center,
+                dem_arr,
+                map_rotation,
+                crop_shape,
+                cv2.INTER_NEAREST,
+                dst=self._dem_warp_out,
+            )
+            reference_arr, M = self._rotate_and_crop_center(
+                orthoimage_arr,
+                map_rotation,
+                crop_shape,
+                dst=self._reference_warp_out,
+            )
+            dem_rotated_arr, _ = dem_future.result()
+            self._reference_warp_out = reference_arr
+            self._dem_warp_out = dem_rotated_arr
 
-            dem_msg.header.stamp = keypoint_cloud.header.stamp
+            reference_image_msg, dem_msg = self._warp_msgs.setdefault(
+                cache_key, (Image(), Image())
+            )
+            array_to_image(reference_arr, "mono8", reference_image_msg)
 
-            # TODO: subscribe to image and add query image with same timestamp as SIFT
-            #  features to ease development and debugging (reduced performance)
-            ortho_stereo_image_msg = OrthoStereoImage(
-                query_sift=keypoint_cloud, reference=reference_image_msg, dem=dem_msg
+            reference_image_msg.header.stamp = keypoint_cloud.header.stamp
+            proj_str = self._world_to_reference_proj_str(
+                M,
+                orthoimage.crs.data,
             )
-            self._previous_map_rotation = map_rotation
-            self._pose_image = ortho_stereo_image_msg
+            assert proj_str is not None
+            # TODO: 16 bit DEM
+            array_to_image(dem_rotated_arr, "mono8", dem_msg)
 
-            ortho_stereo_image_msg.crs = String(data=proj_str)
+            self._warp_cache[cache_key] = reference_image_msg, dem_msg, proj_str
+        else:
+            reference_image_msg, dem_msg, proj_str = cached_warp
 
-            return ortho_stereo_image_msg
+        dem_msg.header.stamp = keypoint_cloud.header.stamp
 
-        return _pnp_image(
-            self.camera_info,
-            keypoint_cloud,
-            self.orthoimage,
+        # TODO: subscribe to image and add query image with same timestamp as SIFT
+        #  features to ease development and debugging (reduced performance)
+        ortho_stereo_image_msg = OrthoStereoImage(
+            query_sift=keypoint_cloud, reference=reference_image_msg, dem=dem_msg
         )
+        ortho_stereo_image_msg.crs = String(data=proj_str)
 
-    @staticmethod
-    def _rotate_and_crop_center(
-        image: np.ndarray, angle_degrees: float, shape: Tuple[int, int]
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """Rotates an image around its center axis and then crops it to the
-        specified shape.
+        return ortho_stereo_image_msg
 
-        :param image: Numpy array representing the image.
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _rotate_and_crop_inverse_matrix(
+        h: int, w: int, angle_degrees: float, shape: Tuple[int, int]
+    ) -> np.ndarray:
+        """Returns the inverse of the matrix that rotates an image around its
+        center axis and then crops it to the specified shape
+
+        Rotations are bucketed so the matrix is cached and returned as a read-only
+        array.
+
+        :param h: Height of the image to rotate
+        :param w: Width of the image to rotate
         :param angle: Rotation angle in degrees.
         :param shape: Tuple (height, width) representing the desired shape
             after cropping.
-        :return: Tuple of 1. Cropped and rotated image, and 2. matrix that can be
-            used to convert points in rotated and cropped frame back into original
-            frame
+        :return: 3x3 matrix that can be used to convert points in rotated and
+            cropped frame back into original frame
         """
-        # Image dimensions
-        h, w = image.shape[:2]
-
         # Center of rotation
         center = (w // 2, h // 2)
 
         # Calculate the rotation matrix
         rotation_matrix = cv2.getRotationMatrix2D(center, angle_degrees, 1.0)
 
-        # Perform the rotation
-        rotated_image = cv2.warpAffine(image, rotation_matrix, (w, h))
-
         # Calculate the cropping coordinates
         dx = center[0] - shape[1] // 2
         dy = center[1] - shape[0] // 2
 
-        # Perform the cropping
-        cropped_image = rotated_image[dy : dy + shape[0], dx : dx + shape[1]]
+        # Bake the center-crop translation into the rotation matrix so that only
+        # the cropped pixels are interpolated
+        rotation_matrix[0, 2] -= dx
+        rotation_matrix[1, 2] -= dy
 
-        # Invert the matrix
-        extended_matrix = np.vstack([rotation_matrix, [0, 0, 1]])
-        inverse_matrix = np.linalg.inv(extended_matrix)
+        # Invert the matrix (closed form for affine transformations), this also
+        # inverts the center-crop translation
+        inverse_matrix = np.eye(3)
+        inverse_matrix[:2] = cv2.invertAffineTransform(rotation_matrix)
 
-        # Center-crop inverse translation
-        T = np.array([[1, 0, dx], [0, 1, dy], [0, 0, 1]])
+        inverse_matrix.setflags(write=False)
+        return inverse_matrix
 
-        inverse_matrix = inverse_matrix @ T
+    @classmethod
+    def _rotate_and_crop_center(
+        cls,
+        image: np.ndarray,
+        angle_degrees: float,
+        shape: Tuple[int, int],
+        interpolation: int = cv2.INTER_LINEAR,
+        dst: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rotates an image around its center axis and then crops it to the
+        specified shape.
+
+        :param image: Numpy array representing the image.
+        :param angle: Rotation angle in degrees.
+        :param shape: Tuple (height, width) representing the desired shape
+            after cropping.
+        :param interpolation: OpenCV interpolation method
+        :param dst: Optional output buffer to write the image into. A new array
+            is allocated if this is None or does not match the output shape and
+            type.
+        :return: Tuple of 1. Cropped and rotated image, and 2. matrix that can be
+            used to convert points in rotated and cropped frame back into original
+            frame
+        """
+        h, w = image.shape[:2]
+        inverse_matrix = cls._rotate_and_crop_inverse_matrix(h, w, angle_degrees, shape)
+
+        # Perform the rotation and cropping. We already have the inverse
+        # (destination to source) mapping so OpenCV does not need to invert the
+        # matrix internally.
+        cropped_image = cv2.warpAffine(
+            image,
+            inverse_matrix[:2],
+            (shape[1], shape[0]),
+            dst=dst,
+            flags=interpolation | cv2.WARP_INVERSE_MAP,
+        )
 
         return cropped_image, inverse_matrix
@@ -12,6 +12,7 @@ reference images and then solving the resulting PnP problem.
 Does not publish a Twist message, instead publishes Pose which should then be
 fused differentially by the EKF.
 """
+import math
 from typing import List, Optional, Tuple, cast
 
 import cv2
@@ -23,10 +24,10 @@ import torch
 from builtin_interfaces.msg import Time
 from cv_bridge import CvBridge
 from geometry_msgs.msg import PoseWithCovariance, PoseWithCovarianceStamped
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
-from sensor_msgs.msg import CameraInfo, Image, PointCloud2, PointField
-from std_msgs.msg import Header
+from sensor_msgs.msg import CameraInfo, Image, PointCloud2
 
 from .. import _transformations as tf_
 from .._decorators import ROS, narrow_types
@@ -41,7 +42,10 @@ from ..constants import (
 )
 from ._shared import (  # COVARIANCE_LIST,
     KEYPOINT_DTYPE,
+    KEYPOINT_FIELDS,
+    BackgroundWorker,
     compute_pose,
+    image_to_mono8,
     visualize_matches_and_pose,
 )
 
@@ -92,7 +96,13 @@ class TwistNode(Node):
         else:
             self._sift = cv2.SIFT_create()
 
-        self._bf = cv2.BFMatcher(crossCheck=False)
+        # Use the CUDA brute force matcher if OpenCV has been built with CUDA
+        # support, SIFT descriptors are float so we match with the L2 norm
+        self._use_cuda_matcher = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        if self._use_cuda_matcher:
+            self._bf = cv2.cuda.DescriptorMatcher_createBFMatcher(cv2.NORM_L2)
+        else:
+            self._bf = cv2.BFMatcher(crossCheck=False)
 
         # Publishers for dev image
         self._matches_publisher = self.create_publisher(
@@ -102,24 +112,58 @@ class TwistNode(Node):
             Image, ROS_TOPIC_RELATIVE_POSITION_IMAGE, 10
         )
 
+        # Draw and publish dev images in a background thread
+        self._visualization_worker = BackgroundWorker(
+            "twist_node_visualization", self.get_logger()
+        )
+
         self._tf_buffer = tf2_ros.Buffer(rclpy.duration.Duration(seconds=30))
         self._tf_listener = tf2_ros.TransformListener(
             self._tf_buffer, self, spin_thread=True
         )
         self._tf_broadcaster = tf2_ros.transform_broadcaster.TransformBroadcaster(self)
 
-        # Cached reference image for visual odometry, also cache SIFT features to
-        # improve performance
+        # Cached reference image for visual odometry, also cache decoded image and
+        # SIFT features to improve performance
         self._cached_reference: Optional[Image] = None
-        self._cached_kps_desc: Optional[Tuple[List[cv2.KeyPoint], np.ndarray]] = None
+        self._cached_kps_desc: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._cached_reference_array: Optional[np.ndarray] = None
         self._previous_image: Optional[Image] = None  # backup for cached reference
 
+        # Camera info message and the horizontal and vertical field of view in
+        # radians computed from it. Stored as a single tuple so that a reader on
+        # another callback thread never sees a field of view paired with a
+        # different camera info message.
+        self._camera_fov_cache: Optional[Tuple[CameraInfo, Tuple[float, float]]] = None
+
         # initialize subscriptions
         self.camera_info
         self.image
         # initialize publisher (for launch tests)
         self.pose
 
+    def _camera_fov(self, camera_info: CameraInfo) -> Tuple[float, float]:
+        """Returns horizontal and vertical field of view in radians
+
+        The field of view is cached by camera info message identity so that it
+        does not need to be recomputed from the intrinsics for every image.
+
+        :param camera_info: Camera info message to compute the field of view for
+        :return: Tuple of horizontal and vertical field of view in radians
+        """
+        cache = self._camera_fov_cache
+        if cache is not None and cache[0] is camera_info:
+            return cache[1]
+
+        fx = camera_info.k[0]  # Focal length x
+        fy = camera_info.k[4]  # Focal length y
+        camera_fov = (
+            2 * np.arctan(camera_info.width / (2 * fx)),
+            2 * np.arctan(camera_info.height / (2 * fy)),
+        )
+        self._camera_fov_cache = (camera_info, camera_fov)
+        return camera_fov
+
     @property
     @ROS.subscribe(
         ROS_TOPIC_CAMERA_INFO,
@@ -142,6 +186,7 @@ class TwistNode(Node):
         ROS_TOPIC_IMAGE,
         QoSPresetProfiles.SENSOR_DATA.value,
         callback=_image_cb,
+        callback_group=MutuallyExclusiveCallbackGroup,
     )
     def image(self) -> Optional[Image]:
         """Subscribed raw image from vehicle camera, or None if unknown"""
@@ -175,26 +220,18 @@ class TwistNode(Node):
         data = np.empty(kps.shape[0], dtype=KEYPOINT_DTYPE)
         data["x"] = kps[:, 0]
         data["y"] = kps[:, 1]
-        data["z"] = np.zeros_like(kps[:, 0])
+        data["z"] = 0.0
         data["size"] = sizes
         data["angle"] = angles
         data["descriptor"] = descs
 
         msg = PointCloud2()
-        msg.header = Header()
         msg.header.stamp = stamp
         msg.header.frame_id = "query_image"
 
         msg.height = 1
         msg.width = len(data)
-        msg.fields = [
-            PointField(name="x", offset=0, datatype=PointField.FLOAT32, count=1),
-            PointField(name="y", offset=4, datatype=PointField.FLOAT32, count=1),
-            PointField(name="z", offset=8, datatype=PointField.FLOAT32, count=1),
-            PointField(
-                name="descriptor", offset=12, datatype=PointField.FLOAT32, count=128
-            ),
-        ]
+        msg.fields = KEYPOINT_FIELDS
         msg.is_bigendian = False
         msg.point_step = data.itemsize
         msg.row_step = data.itemsize * len(data)
@@ -215,368 +252,389 @@ class TwistNode(Node):
         REP 105 ``camera_optical`` frame in its intrinsic frame from successive
         camera images
         """
+        return self._pose(self.camera_info, self.image, self._cached_reference)
 
-        @narrow_types(self)
-        def _pose(
-            camera_info: CameraInfo, query: Image, reference: Image
-        ) -> Optional[PoseWithCovarianceStamped]:
-            qry = self._cv_bridge.imgmsg_to_cv2(query, desired_encoding="mono8")
-            ref = self._cv_bridge.imgmsg_to_cv2(reference, desired_encoding="mono8")
+    @narrow_types
+    def _pose(
+        self, camera_info: CameraInfo, query: Image, reference: Image
+    ) -> Optional[PoseWithCovarianceStamped]:
+        qry = image_to_mono8(query, self._cv_bridge)
 
-            # find the keypoints and descriptors with SIFT
-            kp_qry, desc_qry = self._sift.detectAndCompute(qry, None)
-
-            if self._cached_kps_desc is None:
-                kp_ref, desc_ref = self._sift.detectAndCompute(ref, None)
-            else:
-                kp_ref, desc_ref = self._cached_kps_desc
+        # find the keypoints and descriptors with SIFT
+        kp_qry, desc_qry = self._sift.detectAndCompute(qry, None)
 
-            # Publish query image keypoints and descriptors to be reused downstream in
-            # PoseNode
-            kp_qry_arr = cv2.KeyPoint_convert(kp_qry)
-            size_qry = np.array(
-                tuple(map(lambda kp: kp.size, kp_qry)), dtype=np.float32
-            )
-            angle_qry = np.array(
-                tuple(map(lambda kp: kp.angle, kp_qry)), dtype=np.float32
-            )
-            self._publish_keypoints(
-                query.header.stamp, kp_qry_arr, desc_qry, size_qry, angle_qry
-            )
+        if self._cached_kps_desc is None:
+            ref = image_to_mono8(reference, self._cv_bridge)
+            kp_ref, desc_ref = self._sift.detectAndCompute(ref, None)
+            kp_ref_arr = cv2.KeyPoint_convert(kp_ref)
+        else:
+            # Reference is a previous query image that we have already decoded
+            assert self._cached_reference_array is not None
+            ref = self._cached_reference_array
+            kp_ref_arr, desc_ref = self._cached_kps_desc
+
+        # Publish query image keypoints and descriptors to be reused downstream in
+        # PoseNode
+        kp_qry_arr = cv2.KeyPoint_convert(kp_qry)
+        size_qry = np.fromiter(
+            (kp.size for kp in kp_qry), dtype=np.float32, count=len(kp_qry)
+        )
+        angle_qry = np.fromiter(
+            (kp.angle for kp in kp_qry), dtype=np.float32, count=len(kp_qry)
+        )
+        self._publish_keypoints(
+            query.header.stamp, kp_qry_arr, desc_qry, size_qry, angle_qry
+        )
 
-            try:
-                matches = self._bf.knnMatch(desc_qry, desc_ref, k=2)
-            except cv2.error as e:
-                self.get_logger().debug(
-                    f"Could not match - resetting reference frame: {e}"
-                )
-                # self._cached_reference = self._previous_image
-                return None
+        try:
+            matches = self._knn_match(desc_qry, desc_ref)
+        except cv2.error as e:
+            self.get_logger().debug(f"Could not match - resetting reference frame: {e}")
+            # self._cached_reference = self._previous_image
+            return None
 
-            if len(matches) < self.MIN_MATCHES:
-                self.get_logger().debug(
-                    "Not enough matches - resetting reference frame"
-                )
-                # self._cached_reference = self._previous_image
-                return None
+        if len(matches) < self.MIN_MATCHES:
+            self.get_logger().debug("Not enough matches - resetting reference frame")
+            # self._cached_reference = self._previous_image
+            return None
 
-            # Apply ratio test
-            good = []
-            for m, n in matches:
-                if m.distance < self.CONFIDENCE_THRESHOLD * n.distance:
-                    good.append(m)
-
-            mkps = list(
-                map(
-                    lambda dmatch: (
-                        tuple(kp_qry[dmatch.queryIdx].pt),
-                        tuple(kp_ref[dmatch.trainIdx].pt),
-                    ),
-                    good,
-                )
-            )
-            if mkps is None or len(mkps) < self.MIN_MATCHES:
-                self.get_logger().debug(
-                    "Not enough matches - resetting reference frame"
-                )
-                # self._cached_reference = self._previous_image
-                return None
+        # Apply ratio test (vectorized), k-NN matching may return less than
+        # two matches for some query descriptors so we skip those
+        matches = [match for match in matches if len(match) == 2]
+        distances = np.array(
+            [(m.distance, n.distance) for m, n in matches], dtype=np.float32
+        ).reshape(-1, 2)
+        good_mask = distances[:, 0] < self.CONFIDENCE_THRESHOLD * distances[:, 1]
+        good = [matches[i][0] for i in np.flatnonzero(good_mask)]
+
+        if len(good) < self.MIN_MATCHES:
+            self.get_logger().debug("Not enough matches - resetting reference frame")
+            # self._cached_reference = self._previous_image
+            return None
 
-            mkp_qry, mkp_ref = zip(*mkps)
-            mkp_qry = np.array(mkp_qry)
-            mkp_ref = np.array(mkp_ref)
+        # Gather matched keypoint coordinates with index arrays
+        qry_indices = np.fromiter(
+            (m.queryIdx for m in good), dtype=np.intp, count=len(good)
+        )
+        ref_indices = np.fromiter(
+            (m.trainIdx for m in good), dtype=np.intp, count=len(good)
+        )
+        mkp_qry = kp_qry_arr[qry_indices]
+        mkp_ref = kp_ref_arr[ref_indices]
 
-            pose = compute_pose(camera_info, mkp_qry, mkp_ref, np.zeros_like(qry))
-            if pose is None:
-                # self._cached_reference = self._previous_image
-                return None
-            r, t = pose
+        pose = compute_pose(camera_info, mkp_qry, mkp_ref, None)
+        if pose is None:
+            # self._cached_reference = self._previous_image
+            return None
+        r, t = pose
 
-            # VISUALIZE
-            match_img = visualize_matches_and_pose(
+        # VISUALIZE
+        # Debug images are only drawn if someone is listening
+        if self._matches_publisher.get_subscription_count() > 0:
+            self._visualization_worker.submit(
+                self._publish_matches_image,
                 camera_info,
-                qry.copy(),
-                ref.copy(),
+                qry,
+                ref,
                 mkp_qry,
                 mkp_ref,
                 r,
                 t,
             )
-            ros_match_image = self._cv_bridge.cv2_to_imgmsg(match_img)
-            self._matches_publisher.publish(ros_match_image)
-            # END VISUALIZE
-
-            r_inv = r.T
-            camera_optical_position_in_world = -r_inv @ t
-
-            # Publish camera position in world frame to ROS for debugging
-            try:
-                x, y = camera_optical_position_in_world[0:2].squeeze().tolist()
-                x, y = int(x), int(y)
-                image = cv2.circle(np.array(ref.copy()), (x, y), 5, (0, 255, 0), -1)
-                self._cv_bridge.cv2_to_imgmsg(image)
-                # self._position_publisher.publish(ros_image)
-            except (cv2.error, ValueError) as e:
-                self.get_logger().info(f"Could not draw camera position: {e}")
-                return None
+        # END VISUALIZE
 
-            assert self._hfov is not None  # we have camera info
-            maximum_pitch_before_horizon_visible = (np.pi / 2) - (self._hfov / 2)
+        r_inv = r.T
+        camera_optical_position_in_world = -r_inv @ t
 
-            angle_off_nadir: Optional[float] = None
-            query_time = rclpy.time.Time(
-                seconds=query.header.stamp.sec,
-                nanoseconds=query.header.stamp.nanosec,
+        if not np.all(np.isfinite(camera_optical_position_in_world[0:2])):
+            self.get_logger().info(
+                f"Camera position {camera_optical_position_in_world[0:2]} "
+                f"was not finite"
             )
-            try:
-                transform = tf_.lookup_transform(
-                    self._tf_buffer,
-                    "base_link_stabilized",
-                    "camera_frd",
-                    (query_time, rclpy.duration.Duration(seconds=1.0)),
-                    self.get_logger(),
-                )
-                rotation = transform.transform.rotation
-                quaternion = (rotation.x, rotation.y, rotation.z, rotation.w)
-                angle_off_nadir = tf_.angle_off_nadir(quaternion)
-            except Exception as e:
-                self.get_logger().warn(f"Could not get transform: {e}")
-                return None
+            return None
 
-            assert angle_off_nadir is not None
-            if angle_off_nadir > maximum_pitch_before_horizon_visible:
-                self.get_logger().warning(
-                    f"Angle off nadir: {np.degrees(angle_off_nadir)} degrees, "
-                    f"max angle {np.degrees(maximum_pitch_before_horizon_visible)}. "
-                    f" - skipping matching."
-                )
-                return None
+        # Derive the field of view from the same camera info message that is used
+        # for the rest of this frame. The camera info callback may run concurrently
+        # in another callback group, so it must not be read from node state.
+        camera_fov = self._camera_fov(camera_info)
+        maximum_pitch_before_horizon_visible = (math.pi / 2) - (camera_fov[0] / 2)
 
-            assert angle_off_nadir is not None
-            # TODO: get a better estimate of distance to ground
-            try:
-                distance_to_ground_transform = self._tf_buffer.lookup_transform(
-                    "map", "base_link", query_time, rclpy.duration.Duration(seconds=0.2)
-                )
-            except (
-                tf2_ros.LookupException,
-                tf2_ros.ConnectivityException,
-                tf2_ros.ExtrapolationException,
-            ) as e:
-                self.get_logger().warning(f"Cannot estimate scale for VO: {e}")
-                return None
-
-            distance_to_ground = distance_to_ground_transform.transform.translation.z
-            # TODO: handle infinity here
-            distance_to_ground_along_optical_axis = distance_to_ground / np.cos(
-                angle_off_nadir
+        angle_off_nadir: Optional[float] = None
+        query_time = rclpy.time.Time(
+            seconds=query.header.stamp.sec,
+            nanoseconds=query.header.stamp.nanosec,
+        )
+        try:
+            transform = tf_.lookup_transform(
+                self._tf_buffer,
+                "base_link_stabilized",
+                "camera_frd",
+                (query_time, rclpy.duration.Duration(seconds=1.0)),
+                self.get_logger(),
             )
-            img_dim = self._image_dimensions(distance_to_ground)
-            if img_dim is None:
-                self.get_logger().warning("Cannot determine image dimensions in meters")
-                return None
-            _, _, meters_per_pixel_x, meters_per_pixel_y = img_dim
-            fx = camera_info.k[0]
-            scaling = np.abs(distance_to_ground_along_optical_axis / fx)
-            camera_optical_position_in_world = np.array(
-                [
-                    camera_optical_position_in_world[0] * meters_per_pixel_x,
-                    camera_optical_position_in_world[1] * meters_per_pixel_y,
-                    camera_optical_position_in_world[2] * scaling,
-                ]
+            rotation = transform.transform.rotation
+            quaternion = (rotation.x, rotation.y, rotation.z, rotation.w)
+            angle_off_nadir = tf_.angle_off_nadir(quaternion)
+        except Exception as e:
+            self.get_logger().warn(f"Could not get transform: {e}")
+            return None
+
+        assert angle_off_nadir is not None
+        if angle_off_nadir > maximum_pitch_before_horizon_visible:
+            self.get_logger().warning(
+                f"Angle off nadir: {np.degrees(angle_off_nadir)} degrees, "
+                f"max angle {np.degrees(maximum_pitch_before_horizon_visible)}. "
+                f" - skipping matching."
             )
+            return None
 
-            pose_msg = tf_.create_pose_msg(
-                query.header.stamp,
-                cast(FrameID, "gisnav_camera_link_optical"),
-                r_inv,
-                camera_optical_position_in_world,
+        assert angle_off_nadir is not None
+        # TODO: get a better estimate of distance to ground
+        try:
+            distance_to_ground_transform = self._tf_buffer.lookup_transform(
+                "map", "base_link", query_time, rclpy.duration.Duration(seconds=0.2)
             )
-            if pose_msg is None:
-                # TODO: handle better
-                return None
+        except (
+            tf2_ros.LookupException,
+            tf2_ros.ConnectivityException,
+            tf2_ros.ExtrapolationException,
+        ) as e:
+            self.get_logger().warning(f"Cannot estimate scale for VO: {e}")
+            return None
+
+        distance_to_ground = distance_to_ground_transform.transform.translation.z
+        # TODO: handle infinity here
+        distance_to_ground_along_optical_axis = distance_to_ground / math.cos(
+            angle_off_nadir
+        )
+        img_dim = self._image_dimensions(camera_info, camera_fov, distance_to_ground)
+        if img_dim is None:
+            self.get_logger().warning("Cannot determine image dimensions in meters")
+            return None
+        _, _, meters_per_pixel_x, meters_per_pixel_y = img_dim
+        fx = camera_info.k[0]
+        scaling = abs(distance_to_ground_along_optical_axis / fx)
+        camera_optical_position_in_world = np.array(
+            [
+                camera_optical_position_in_world[0] * meters_per_pixel_x,
+                camera_optical_position_in_world[1] * meters_per_pixel_y,
+                camera_optical_position_in_world[2] * scaling,
+            ]
+        )
+
+        pose_msg = tf_.create_pose_msg(
+            query.header.stamp,
+            cast(FrameID, "gisnav_camera_link_optical"),
+            r_inv,
+            camera_optical_position_in_world,
+        )
+        if pose_msg is None:
+            # TODO: handle better
+            return None
 
-            # Todo: brittle - multiply with scaling only once (see above), e.g. multiply
-            #  difference from principal point
-            fx = camera_info.k[0]
-            pose_msg.pose.position.x -= meters_per_pixel_x * camera_info.width / 2
-            pose_msg.pose.position.y -= meters_per_pixel_y * camera_info.height / 2
-            pose_msg.pose.position.z += scaling * fx
+        # Todo: brittle - multiply with scaling only once (see above), e.g. multiply
+        #  difference from principal point
+        fx = camera_info.k[0]
+        pose_msg.pose.position.x -= meters_per_pixel_x * camera_info.width / 2
+        pose_msg.pose.position.y -= meters_per_pixel_y * camera_info.height / 2
+        pose_msg.pose.position.z += scaling * fx
 
-            reftime = rclpy.time.Time(
-                seconds=reference.header.stamp.sec,
-                nanoseconds=reference.header.stamp.nanosec,
+        reftime = rclpy.time.Time(
+            seconds=reference.header.stamp.sec,
+            nanoseconds=reference.header.stamp.nanosec,
+        )
+        # if self._tf_buffer.can_transform(
+        #    "gisnav_odom",
+        #    "gisnav_camera_link_optical",
+        #    reftime,
+        #    rclpy.duration.Duration(seconds=0.2),  # rclpy.time.Time(),
+        # ):
+
+        if not self._tf_buffer.can_transform(
+            "gisnav_map", "gisnav_odom", rclpy.time.Time()
+        ):
+            map_to_odom = tf_.lookup_transform(
+                self._tf_buffer, "map", "odom", logger=self.get_logger()
             )
-            # if self._tf_buffer.can_transform(
-            #    "gisnav_odom",
-            #    "gisnav_camera_link_optical",
-            #    reftime,
-            #    rclpy.duration.Duration(seconds=0.2),  # rclpy.time.Time(),
-            # ):
-
-            if not self._tf_buffer.can_transform(
-                "gisnav_map", "gisnav_odom", rclpy.time.Time()
-            ):
-                map_to_odom = tf_.lookup_transform(
-                    self._tf_buffer, "map", "odom", logger=self.get_logger()
+            if map_to_odom is not None:
+                map_to_odom.header.frame_id = "gisnav_map"
+                map_to_odom.child_frame_id = "gisnav_odom"
+                self.get_logger().info(
+                    "Initializing gisnav_map to gisnav_odom from"
+                    "FCU (from map to odom"
                 )
-                if map_to_odom is not None:
-                    map_to_odom.header.frame_id = "gisnav_map"
-                    map_to_odom.child_frame_id = "gisnav_odom"
-                    self.get_logger().info(
-                        "Initializing gisnav_map to gisnav_odom from"
-                        "FCU (from map to odom"
-                    )
-                    self._tf_broadcaster.sendTransform(map_to_odom)
-                else:
-                    self.get_logger().warning(
-                        "Could not init gisnav_map to gisnav_odom"
-                    )
-
-            camera_optical_to_odom = tf_.lookup_transform(
+                self._tf_broadcaster.sendTransform(map_to_odom)
+            else:
+                self.get_logger().warning("Could not init gisnav_map to gisnav_odom")
+
+        camera_optical_to_odom = tf_.lookup_transform(
+            self._tf_buffer,
+            "gisnav_odom",
+            "gisnav_camera_link_optical",
+            (reftime, rclpy.duration.Duration(seconds=0.2)),
+            logger=self.get_logger(),
+        )
+        if camera_optical_to_odom is None:
+            self.get_logger().warning(
+                "Could not find transform from gisnav_camera_link_optical to "
+                "gisnav_odom - initializing gisnav_odom to gisnav_base_link from "
+                "FCU."
+            )
+            odom_to_base_link = tf_.lookup_transform(
                 self._tf_buffer,
-                "gisnav_odom",
-                "gisnav_camera_link_optical",
+                "base_link",
+                "odom",
                 (reftime, rclpy.duration.Duration(seconds=0.2)),
                 logger=self.get_logger(),
             )
-            if camera_optical_to_odom is None:
-                self.get_logger().warning(
-                    "Could not find transform from gisnav_camera_link_optical to "
-                    "gisnav_odom - initializing gisnav_odom to gisnav_base_link from "
-                    "FCU."
-                )
-                odom_to_base_link = tf_.lookup_transform(
-                    self._tf_buffer,
-                    "base_link",
-                    "odom",
-                    (reftime, rclpy.duration.Duration(seconds=0.2)),
-                    logger=self.get_logger(),
-                )
-
-                if odom_to_base_link is None:
-                    self.get_logger().info(
-                        "Could not determine odom to base_link, returning None"
-                    )
-                    return None
-
-                odom_to_base_link.header.frame_id = "gisnav_odom"
-                odom_to_base_link.child_frame_id = "gisnav_base_link"
-                self.get_logger().info(
-                    "Initializing gisnav_odom to gisnav_base_link from FCU"
-                )
-                self._tf_broadcaster.sendTransform(odom_to_base_link)
-
-                # try again
-                camera_optical_to_odom = tf_.lookup_transform(
-                    self._tf_buffer,
-                    "gisnav_odom",
-                    "gisnav_camera_link_optical",
-                    (reftime, rclpy.duration.Duration(seconds=0.2)),
-                    logger=self.get_logger(),
-                )
 
-            if camera_optical_to_odom is None:
+            if odom_to_base_link is None:
                 self.get_logger().info(
-                    "Could not determine gisnav camera link optical to odom transform, "
-                    "returning None"
+                    "Could not determine odom to base_link, returning None"
                 )
                 return None
 
-            pose_msg.pose = tf2_geometry_msgs.do_transform_pose(
-                pose_msg.pose, camera_optical_to_odom
+            odom_to_base_link.header.frame_id = "gisnav_odom"
+            odom_to_base_link.child_frame_id = "gisnav_base_link"
+            self.get_logger().info(
+                "Initializing gisnav_odom to gisnav_base_link from FCU"
             )
-            pose_msg.header.frame_id = "gisnav_odom"
-
-            # report base_link pose instead of camera frame pose
-            # (fix difference in orientation)
-            try:
-                transform = self._tf_buffer.lookup_transform(
-                    "gisnav_camera_link_optical",
-                    "gisnav_base_link",
-                    query_time,
-                    rclpy.duration.Duration(seconds=0.2),
-                )
-            except (
-                tf2_ros.LookupException,
-                tf2_ros.ConnectivityException,
-                tf2_ros.ExtrapolationException,
-            ) as e:
-                self.get_logger().warning(
-                    f"Could not transform from gisnav_camera_link_optical to "
-                    f"gisnav_base_link. Skipping publishing pose. {e}"
-                )
-                return None
+            self._tf_broadcaster.sendTransform(odom_to_base_link)
+
+            # try again
+            camera_optical_to_odom = tf_.lookup_transform(
+                self._tf_buffer,
+                "gisnav_odom",
+                "gisnav_camera_link_optical",
+                (reftime, rclpy.duration.Duration(seconds=0.2)),
+                logger=self.get_logger(),
+            )
+
+        if camera_optical_to_odom is None:
+            self.get_logger().info(
+                "Could not determine gisnav camera link optical to odom transform, "
+                "returning None"
+            )
+            return None
 
-            transform = tf_.add_transform_stamped(pose_msg, transform)
-            pose_msg.pose.orientation = transform.transform.rotation
-            assert (
-                pose_msg.header.frame_id == "gisnav_odom"
-            ), f"pose_msg header should be gisnav_odom (was {pose_msg.header.frame_id})"
-            assert pose_msg.header.stamp == query.header.stamp
+        pose_msg.pose = tf2_geometry_msgs.do_transform_pose(
+            pose_msg.pose, camera_optical_to_odom
+        )
+        pose_msg.header.frame_id = "gisnav_odom"
 
-            # TODO: use custom error model for VO
-            pose_with_covariance = PoseWithCovariance(
-                pose=pose_msg.pose  # , covariance=COVARIANCE_LIST
+        # report base_link pose instead of camera frame pose
+        # (fix difference in orientation)
+        try:
+            transform = self._tf_buffer.lookup_transform(
+                "gisnav_camera_link_optical",
+                "gisnav_base_link",
+                query_time,
+                rclpy.duration.Duration(seconds=0.2),
             )
-            pose_with_covariance = PoseWithCovarianceStamped(
-                header=pose_msg.header, pose=pose_with_covariance
+        except (
+            tf2_ros.LookupException,
+            tf2_ros.ConnectivityException,
+            tf2_ros.ExtrapolationException,
+        ) as e:
+            self.get_logger().warning(
+                f"Could not transform from gisnav_camera_link_optical to "
+                f"gisnav_base_link. Skipping publishing pose. {e}"
             )
-            self._cached_reference = query
-            self._cached_kps_desc = kp_qry, desc_qry
+            return None
 
-            return pose_with_covariance
+        transform = tf_.add_transform_stamped(pose_msg, transform)
+        pose_msg.pose.orientation = transform.transform.rotation
+        assert (
+            pose_msg.header.frame_id == "gisnav_odom"
+        ), f"pose_msg header should be gisnav_odom (was {pose_msg.header.frame_id})"
+        assert pose_msg.header.stamp == query.header.stamp
 
-        return _pose(self.camera_info, self.image, self._cached_reference)
+        # TODO: use custom error model for VO
+        pose_with_covariance = PoseWithCovariance(
+            pose=pose_msg.pose  # , covariance=COVARIANCE_LIST
+        )
+        pose_with_covariance = PoseWithCovarianceStamped(
+            header=pose_msg.header, pose=pose_with_covariance
+        )
+        self._cached_reference = query
+        self._cached_reference_array = qry
+        self._cached_kps_desc = kp_qry_arr, desc_qry
 
-    @property
-    def _hfov(self) -> Optional[float]:
-        """Horizontal field of view in radians"""
+        return pose_with_covariance
 
-        @narrow_types(self)
-        def _hfov(camera_info: CameraInfo) -> Optional[float]:
-            # Extract the focal length in the x direction from the intrinsics matrix
-            fx = self.camera_info.k[0]
+    def _publish_matches_image(
+        self,
+        camera_info: CameraInfo,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        mkp_qry: np.ndarray,
+        mkp_ref: np.ndarray,
+        r: np.ndarray,
+        t: np.ndarray,
+    ) -> None:
+        """Draws and publishes keypoint matches and projected FOV for debugging
+
+        Runs in :attr:`._visualization_worker` background thread.
+        """
+        match_img = visualize_matches_and_pose(
+            camera_info,
+            qry,
+            ref.copy(),
+            mkp_qry,
+            mkp_ref,
+            r,
+            t,
+        )
+        ros_match_image = self._cv_bridge.cv2_to_imgmsg(match_img)
+        self._matches_publisher.publish(ros_match_image)
 
-            # Calculate the horizontal field of view (HFOV)
-            hfov = 2 * np.arctan(self.camera_info.width / (2 * fx))
+    def _knn_match(
+        self, desc_qry: np.ndarray, desc_ref: np.ndarray
+    ) -> List[List[cv2.DMatch]]:
+        """Returns the two nearest reference descriptors for each query descriptor
 
-            return hfov
+        Matches on GPU if OpenCV has been built with CUDA support, otherwise
+        falls back to matching on CPU.
 
-        return _hfov(self.camera_info)
+        :param desc_qry: Query image descriptors
+        :param desc_ref: Reference image descriptors
+        :return: List of (up to) two best matches for each query descriptor
+        :raise: :class:`cv2.error` if the descriptors could not be matched
+        """
+        if self._use_cuda_matcher:
+            desc_qry_gpu = cv2.cuda_GpuMat()
+            desc_qry_gpu.upload(desc_qry)
+            desc_ref_gpu = cv2.cuda_GpuMat()
+            desc_ref_gpu.upload(desc_ref)
+            return self._bf.knnMatch(desc_qry_gpu, desc_ref_gpu, k=2)
 
-    def _image_dimensions(
-        self, distance_to_ground_along_principal_axis: float
-    ) -> Optional[Tuple[float, float, float, float]]:
-        @narrow_types(self)
-        def _image_dimensions(
-            camera_info: CameraInfo, distance_to_ground_along_principal_axis: float
-        ) -> Tuple[float, float, float, float]:
-            # Extract camera parameters
-            fx = camera_info.k[0]  # Focal length x
-            fy = camera_info.k[4]  # Focal length y
-            width = camera_info.width
-            height = camera_info.height
-
-            # Calculate field of view
-            fov_horizontal = 2 * np.arctan(width / (2 * fx))
-            fov_vertical = 2 * np.arctan(height / (2 * fy))
-
-            # Calculate plane dimensions
-            plane_width_meters = (
-                2 * distance_to_ground_along_principal_axis * np.tan(fov_horizontal / 2)
-            )
-            plane_height_meters = (
-                2 * distance_to_ground_along_principal_axis * np.tan(fov_vertical / 2)
-            )
+        return self._bf.knnMatch(desc_qry, desc_ref, k=2)
 
-            return (
-                plane_width_meters,
-                plane_height_meters,
-                plane_width_meters / width,
-                plane_height_meters / height,
-            )
+    @narrow_types
+    def _image_dimensions(
+        self,
+        camera_info: CameraInfo,
+        camera_fov: Tuple[float, float],
+        distance_to_ground_along_principal_axis: float,
+    ) -> Tuple[float, float, float, float]:
+        # Extract camera parameters
+        width = camera_info.width
+        height = camera_info.height
+
+        # Field of view is passed in from :meth:`._camera_fov`
+        fov_horizontal, fov_vertical = camera_fov
+
+        # Calculate plane dimensions
+        plane_width_meters = (
+            2 * distance_to_ground_along_principal_axis * np.tan(fov_horizontal / 2)
+        )
+        plane_height_meters = (
+            2 * distance_to_ground_along_principal_axis * np.tan(fov_vertical / 2)
+        )
 
-        return _image_dimensions(
-            self.camera_info, distance_to_ground_along_principal_axis
+        return (
+            plane_width_meters,
+            plane_height_meters,
+            plane_width_meters / width,
+            plane_height_meters / height,
         )
@@ -1,5 +1,6 @@
 """Abstract base class for :class:`.UORBNode` and :class:`.UBXNode`
 """
+import math
 from abc import ABC, abstractmethod
 from typing import Final, Optional, Tuple, TypedDict
 
@@ -7,7 +8,6 @@ import numpy as np
 import rclpy
 import tf2_geometry_msgs
 import tf2_ros
-import tf_transformations
 from builtin_interfaces.msg import Time
 from geometry_msgs.msg import PointStamped, PoseStamped, TwistWithCovariance, Vector3
 from nav_msgs.msg import Odometry
@@ -189,9 +189,9 @@ class MockGPSNode(Node, ABC):
         # assume no covariances
         x_var = pose_cov[0, 0]
         y_var = pose_cov[1, 1]
-        eph = np.sqrt(x_var + y_var)
+        eph = math.sqrt(x_var + y_var)
         z_var = pose_cov[2, 2]
-        epv = np.sqrt(z_var)
+        epv = math.sqrt(z_var)
 
         # 3D velocity
         twist_with_covariance = odometry.twist
@@ -221,19 +221,9 @@ class MockGPSNode(Node, ABC):
             logger=self.get_logger(),
         )
         pose_map = tf2_geometry_msgs.do_transform_pose(pose, transform_earth_to_map)
-        euler = tf_transformations.euler_from_quaternion(
-            tf_.as_np_quaternion(pose_map.orientation).tolist()
-        )
-        yaw_rad = euler[2]  # ENU frame
-        yaw_rad = -yaw_rad  # NED frame ("heading")
-
-        if yaw_rad < 0:
-            yaw_rad = 2 * np.pi + yaw_rad
-
-        # re-center yaw to [0, 2*pi), it should be at [-pi, pi) before re-centering
-        yaw_rad += np.pi / 2
-        vehicle_yaw_degrees = np.degrees(yaw_rad)
-        vehicle_yaw_degrees = int(vehicle_yaw_degrees % 360)
+        # ENU frame yaw to NED frame heading in [0, 360) degrees, computed
+        # directly from the quaternion without a full Euler angle conversion
+        vehicle_yaw_degrees = int(tf_.extract_yaw(pose_map.orientation))
         # MAVLink yaw definition 0 := not available
         vehicle_yaw_degrees = 360 if vehicle_yaw_degrees == 0 else vehicle_yaw_degrees
 
@@ -246,71 +236,12 @@ class MockGPSNode(Node, ABC):
         vel_d_m_s_var = twist_cov[2, 2]
         s_variance_m_s = vel_n_m_s_var + vel_e_m_s_var + vel_d_m_s_var
 
-        # Course over ground and its variance
-        def _calculate_cog_variance(
-            vel_n_m_s, vel_e_m_s, vel_n_m_s_var, vel_e_m_s_var
-        ) -> float:
-            numerator = (vel_e_m_s_var * vel_n_m_s**2) + (
-                vel_n_m_s_var * vel_e_m_s**2
-            )
-            denominator = (vel_e_m_s**2 + vel_n_m_s**2) ** 2
-
-            # Calculate the variance of the CoG in radians
-            cog_var = numerator / denominator
-
-            # TODO handle possible exceptions arising from variance exploding at 0
-            #  velocity (as it should)
-            return float(cog_var)
-
-        def _calculate_course_over_ground(
-            east_velocity: float, north_velocity: float
-        ) -> float:
-            """
-            Calculates course over ground from east and north velocities.
-
-            :param east_velocity: The velocity towards the east in meters per
-                second.
-            :param north_velocity: The velocity towards the north in meters per
-                second.
-            :return: The course over ground in degrees from the north, in the range
-                [0, 2 * pi).
-
-            The course over ground is calculated using the arctangent of the east
-            and north velocities. The result is adjusted to ensure it is within
-            the [0, 2 * pi) range.
-            """
-            magnitude = np.sqrt(east_velocity**2 + north_velocity**2)
-
-            if east_velocity >= 0 and north_velocity >= 0:
-                # top-right quadrant
-                course_over_ground_radians = np.arcsin(east_velocity / magnitude)
-            elif east_velocity >= 0 > north_velocity:
-                # bottom-right quadrant
-                course_over_ground_radians = 0.5 * np.pi + np.arcsin(
-                    -north_velocity / magnitude
-                )
-            elif east_velocity < 0 and north_velocity < 0:
-                # bottom-left quadrant
-                course_over_ground_radians = np.pi + np.arcsin(
-                    -east_velocity / magnitude
-                )
-            elif east_velocity < 0 <= north_velocity:
-                # top-left quadrant
-                course_over_ground_radians = 1.5 * np.pi + np.arcsin(
-                    north_velocity / magnitude
-                )
-            else:
-                # todo: this is unreachable?
-                course_over_ground_radians = 0.0
-
-            return course_over_ground_radians
-
         # Compute course over ground - pay attention to sine only being
         # defined for 0<=theta<=90
-        cog = _calculate_course_over_ground(vel_e_m_s, vel_n_m_s)
+        cog = self._calculate_course_over_ground(vel_e_m_s, vel_n_m_s)
 
         # Compute course over ground variance
-        cog_variance_rad = _calculate_cog_variance(
+        cog_variance_rad = self._calculate_cog_variance(
             vel_n_m_s, vel_e_m_s, vel_n_m_s_var, vel_e_m_s_var
         )
 
@@ -333,6 +264,62 @@ class MockGPSNode(Node, ABC):
             "satellites_visible": satellites_visible,
         }
 
+    @staticmethod
+    def _calculate_cog_variance(
+        vel_n_m_s, vel_e_m_s, vel_n_m_s_var, vel_e_m_s_var
+    ) -> float:
+        numerator = (vel_e_m_s_var * vel_n_m_s**2) + (vel_n_m_s_var * vel_e_m_s**2)
+        denominator = (vel_e_m_s**2 + vel_n_m_s**2) ** 2
+
+        # Calculate the variance of the CoG in radians
+        cog_var = numerator / denominator
+
+        # TODO handle possible exceptions arising from variance exploding at 0
+        #  velocity (as it should)
+        return float(cog_var)
+
+    @staticmethod
+    def _calculate_course_over_ground(
+        east_velocity: float, north_velocity: float
+    ) -> float:
+        """
+        Calculates course over ground from east and north velocities.
+
+        :param east_velocity: The velocity towards the east in meters per
+            second.
+        :param north_velocity: The velocity towards the north in meters per
+            second.
+        :return: The course over ground in degrees from the north, in the range
+            [0, 2 * pi).
+
+        The course over ground is calculated using the arctangent of the east
+        and north velocities. The result is adjusted to ensure it is within
+        the [0, 2 * pi) range.
+        """
+        magnitude = np.sqrt(east_velocity**2 + north_velocity**2)
+
+        if east_velocity >= 0 and north_velocity >= 0:
+            # top-right quadrant
+            course_over_ground_radians = np.arcsin(east_velocity / magnitude)
+        elif east_velocity >= 0 > north_velocity:
+            # bottom-right quadrant
+            course_over_ground_radians = 0.5 * np.pi + np.arcsin(
+                -north_velocity / magnitude
+            )
+        elif east_velocity < 0 and north_velocity < 0:
+            # bottom-left quadrant
+            course_over_ground_radians = np.pi + np.arcsin(-east_velocity / magnitude)
+        elif east_velocity < 0 <= north_velocity:
+            # top-left quadrant
+            course_over_ground_radians = 1.5 * np.pi + np.arcsin(
+                north_velocity / magnitude
+            )
+        else:
+            # todo: this is unreachable?
+            course_over_ground_radians = 0.0
+
+        return course_over_ground_radians
+
     @property
     @ROS.parameter(ROS_D_DEM_VERTICAL_DATUM, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
     def dem_vertical_datum(self) -> Optional[int]:
@@ -411,10 +398,9 @@ class MockGPSNode(Node, ABC):
         self, twist_with_cov, stamp, from_frame, to_frame
     ):
         # Transform the linear component
-        ts = rclpy.time.Time(seconds=stamp.sec, nanoseconds=stamp.nanosec)
         point = PointStamped()
         point.header.frame_id = from_frame
-        point.header.stamp = ts.to_msg()  # stamp
+        point.header.stamp = stamp
         point.point.x = twist_with_cov.twist.linear.x
         point.point.y = twist_with_cov.twist.linear.y
         point.point.z = twist_with_cov.twist.linear.z
@@ -435,16 +421,10 @@ class MockGPSNode(Node, ABC):
             transform.transform.translation = Vector3()
             transformed_point = tf2_geometry_msgs.do_transform_point(point, transform)
 
-            quat = [
-                transform.transform.rotation.x,
-                transform.transform.rotation.y,
-                transform.transform.rotation.z,
-                transform.transform.rotation.w,
-            ]
             # Get the rotation matrix from the quaternion
-            rot_matrix = tf_transformations.quaternion_matrix(quat)[
-                :3, :3
-            ]  # We only need the 3x3 rotation part
+            rot_matrix = tf_.rotation_matrix_from_quaternion(
+                transform.transform.rotation
+            )
 
             # The Jacobian for linear velocity is just the rotation matrix
             J = rot_matrix
@@ -1,10 +1,10 @@
 """This module contains :class:`.NMEANode`, an extension ROS node that publishes
 mock GPS (GNSS) messages as NMEA sentences to ROS
 """
+import math
 from datetime import datetime
 from typing import Final, Tuple
 
-import numpy as np
 import pynmea2
 import rclpy.time
 import tf2_ros
@@ -60,9 +60,9 @@ class NMEANode(MockGPSNode):
         epv_sqrd = mock_gps_dict["epv"] ** 2
 
         self.publish_nmea_sentences(
-            rms=np.sqrt(eph_sqrd + epv_sqrd),
-            sd_x=np.sqrt(eph_sqrd / 2),
-            sd_y=np.sqrt(eph_sqrd / 2),
+            rms=math.sqrt(eph_sqrd + epv_sqrd),
+            sd_x=math.sqrt(eph_sqrd / 2),
+            sd_y=math.sqrt(eph_sqrd / 2),
             sd_z=epv_sqrd,
             **mock_gps_dict,
         )
@@ -100,7 +100,7 @@ class NMEANode(MockGPSNode):
             lon_nmea,
             lon_dir,
             ground_speed_knots,
-            np.degrees(cog),
+            math.degrees(cog),
             date_str,
         )
 
@@ -145,9 +145,7 @@ class NMEANode(MockGPSNode):
         lon_dir = "E" if lon_deg >= 0 else "W"
 
         # Calculate ground speed in knots and course over ground
-        ground_speed_knots = (
-            np.sqrt(vel_n_m_s**2 + vel_e_m_s**2) * 1.94384
-        )  # m/s to knots
+        ground_speed_knots = math.hypot(vel_n_m_s, vel_e_m_s) * 1.94384  # m/s to knots
 
         # The PX4 nmea.cpp driver sets s_variance_m_s to 0 if we publish velocity,
         # which will inevitable lead to failsafes triggering when the simulated GPS
@@ -162,7 +160,7 @@ class NMEANode(MockGPSNode):
         self.GGA(
             header, time_str, lat_nmea, lat_dir, lon_nmea, lon_dir, altitude_amsl, hdop
         )
-        self.VTG(header, np.degrees(cog), ground_speed_knots)
+        self.VTG(header, math.degrees(cog), ground_speed_knots)
         self.GSA(header, pdop, hdop, vdop)
         self.HDT(header, float(yaw_degrees))
         self.GST(header, time_str, rms, eph, eph, 0.0, sd_y, sd_x, sd_z)
@@ -1,10 +1,10 @@
 """This module contains :class:`.UORBNode`, an extension ROS node that publishes PX4
 uORB :class:`.SensorGps` (GNSS) messages to the uXRCE-DDS middleware
 """
+import math
 import time
 from typing import Final, Optional
 
-import numpy as np
 from rcl_interfaces.msg import ParameterDescriptor
 from ublox_msgs.msg import NavPVT
 
@@ -116,17 +116,17 @@ class UBXNode(MockGPSNode):
             msg.vel_e = int(vel_e_m_s * int(1e3))  # NED east velocity in mm/s
             msg.vel_d = int(vel_d_m_s * int(1e3))  # NED down velocity in mm/s
             msg.g_speed = int(
-                np.sqrt(vel_n_m_s**2 + vel_e_m_s**2) * int(1e3)
+                math.hypot(vel_n_m_s, vel_e_m_s) * int(1e3)
             )  # Ground Speed (2-D) in mm/s
             msg.heading = int(
-                np.degrees(cog) * int(1e5)
+                math.degrees(cog) * int(1e5)
             )  # Heading of motion (2-D) in degrees * 1e-5
 
             msg.s_acc = int(
                 s_variance_m_s * int(1e3)
             )  # Speed accuracy estimate in mm/s
             msg.head_acc = int(
-                np.degrees(h_variance_rad) * int(1e5)
+                math.degrees(h_variance_rad) * int(1e5)
             )  # Heading accuracy estimate in degrees * 1e-5
 
             msg.p_dop = 0  # Position DOP * 0.01 (unitless)
@@ -1,9 +1,9 @@
 """This module contains :class:`.UORBNode`, an extension ROS node that publishes PX4
 uORB :class:`.SensorGps` (GNSS) messages to the uXRCE-DDS middleware
 """
+import math
 from typing import Final, Optional
 
-import numpy as np
 from px4_msgs.msg import SensorGps
 from rcl_interfaces.msg import ParameterDescriptor
 
@@ -56,7 +56,7 @@ class UORBNode(MockGPSNode):
         > [!IMPORTANT] px4_msgs release/1.14
         > Uses the release/1.14 tag version of :class:`px4_msgs.msg.SensorGps`
         """
-        yaw_rad = np.radians(yaw_degrees)
+        yaw_rad = math.radians(yaw_degrees)
         msg = SensorGps()
 
         try:
@@ -79,7 +79,7 @@ class UORBNode(MockGPSNode):
             msg.jamming_state = 0  # 1 := OK, 0 := UNKNOWN
             msg.jamming_indicator = 0
             msg.spoofing_state = 0  # 1 := OK, 0 := UNKNOWN
-            msg.vel_m_s = np.sqrt(vel_n_m_s**2 + vel_e_m_s**2 + vel_d_m_s**2)
+            msg.vel_m_s = math.sqrt(vel_n_m_s**2 + vel_e_m_s**2 + vel_d_m_s**2)
             msg.vel_n_m_s = vel_n_m_s
             msg.vel_e_m_s = vel_e_m_s
             msg.vel_d_m_s = vel_d_m_s
@@ -135,6 +135,7 @@ setup(
             "pytest",
             "python-dateutil>=2.8.2",
             "pyyaml",
+            "scipy",
             "sphinx-copybutton",
             "sphinx-design",
             "sphinx-markdown-builder==0.6.6",
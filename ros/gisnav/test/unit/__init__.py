@@ -1,5 +1 @@
-"""This sub-package contains unit tests
-
-> [!NOTE] Not implemented
-> No unit test suites implemented yet.
-"""
+"""This sub-package contains unit tests"""
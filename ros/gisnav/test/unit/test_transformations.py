@@ -0,0 +1,363 @@
+"""Tests the quaternion and rotation matrix helpers in :mod:`gisnav._transformations`
+
+The hand-written quaternion math is checked against :class:`scipy.spatial.transform.
+Rotation` on random rotations, and on the edge cases where the rotation angle is
+180 degrees and the trace of the rotation matrix is not positive.
+"""
+import unittest
+
+import numpy as np
+import tf_transformations
+from geometry_msgs.msg import PoseStamped, TransformStamped
+from scipy.spatial.transform import Rotation
+
+from gisnav import _transformations as tf_
+
+SAMPLES = 2000
+"""Number of random rotations to test each helper with"""
+
+SEED = 0
+"""Random seed for reproducible test rotations"""
+
+EDGE_CASE_ROTATIONS = Rotation.from_rotvec(
+    np.pi
+    * np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [1.0, 1.0, 0.0] / np.sqrt(2),
+            [0.0, 1.0, 1.0] / np.sqrt(2),
+            [1.0, 0.0, 1.0] / np.sqrt(2),
+            [1.0, 1.0, 1.0] / np.sqrt(3),
+            [-1.0, 2.0, -3.0] / np.sqrt(14),
+        ]
+    )
+)
+"""180 degree rotations whose rotation matrices have a negative trace"""
+
+
+def _random_rotations() -> Rotation:
+    """Returns :py:data:`.SAMPLES` uniformly distributed random rotations"""
+    return Rotation.random(SAMPLES, random_state=SEED)
+
+
+def _canonical(q: np.ndarray) -> np.ndarray:
+    """Returns (x, y, z, w) quaternion with non-negative w"""
+    return -q if q[3] < 0 else q
+
+
+def _transform(
+    q: np.ndarray, t: np.ndarray, frame_id: str, child_frame_id: str
+) -> TransformStamped:
+    """Returns transform with given (x, y, z, w) rotation and translation"""
+    transform = TransformStamped()
+    transform.header.frame_id = frame_id
+    transform.child_frame_id = child_frame_id
+    transform.transform.rotation = tf_.as_ros_quaternion(q)
+    (
+        transform.transform.translation.x,
+        transform.transform.translation.y,
+        transform.transform.translation.z,
+    ) = t.tolist()
+    return transform
+
+
+class TestQuaternionFromRotationMatrix(unittest.TestCase):
+    """Tests :func:`.quaternion_from_rotation_matrix`"""
+
+    def assertSameRotation(self, q: np.ndarray, expected: np.ndarray) -> None:
+        """Asserts that two quaternions represent the same rotation
+
+        Quaternions with a w of (close to) zero can validly differ in sign.
+        """
+        if not np.allclose(q, expected, atol=1e-9):
+            np.testing.assert_allclose(q, -expected, atol=1e-9)
+
+    def test_matches_scipy(self):
+        """Tests that the quaternion matches SciPy for random rotations"""
+        for rotation in _random_rotations():
+            q = tf_.quaternion_from_rotation_matrix(rotation.as_matrix())
+            self.assertSameRotation(q, _canonical(rotation.as_quat()))
+
+    def test_trace_not_positive(self):
+        """Tests the branches of Shepperd's method for non-positive trace"""
+        for rotation in EDGE_CASE_ROTATIONS:
+            r = rotation.as_matrix()
+            self.assertLessEqual(np.trace(r), 0)
+            q = tf_.quaternion_from_rotation_matrix(r)
+            self.assertSameRotation(q, _canonical(rotation.as_quat()))
+            np.testing.assert_allclose(Rotation.from_quat(q).as_matrix(), r, atol=1e-9)
+
+    def test_w_non_negative(self):
+        """Tests that the returned quaternion has a non-negative w"""
+        rotations = _random_rotations()
+        for rotation in rotations:
+            q = tf_.quaternion_from_rotation_matrix(rotation.as_matrix())
+            self.assertGreaterEqual(q[3], 0)
+
+        # Same rotation given with a negative w
+        q = tf_.quaternion_from_rotation_matrix(
+            Rotation.from_quat([0.1, 0.2, 0.3, -0.9]).as_matrix()
+        )
+        self.assertGreaterEqual(q[3], 0)
+
+    def test_unit_norm(self):
+        """Tests that the returned quaternion is normalized"""
+        for rotation in list(_random_rotations()) + list(EDGE_CASE_ROTATIONS):
+            q = tf_.quaternion_from_rotation_matrix(rotation.as_matrix())
+            self.assertAlmostEqual(np.linalg.norm(q), 1.0)
+
+    def test_homogenous_matrix(self):
+        """Tests that only the rotation part of a 4x4 matrix is used"""
+        rotation = Rotation.from_euler("xyz", [10, -20, 30], degrees=True)
+        m = np.identity(4)
+        m[:3, :3] = rotation.as_matrix()
+        m[:3, 3] = [1.0, 2.0, 3.0]
+        np.testing.assert_allclose(
+            tf_.quaternion_from_rotation_matrix(m),
+            tf_.quaternion_from_rotation_matrix(rotation.as_matrix()),
+        )
+
+    def test_improper_rotation_fallback(self):
+        """Tests that matrices with non-positive determinant fall back to
+        :func:`tf_transformations.quaternion_from_matrix`
+        """
+        r = np.diag([1.0, 1.0, -1.0, 1.0])
+        np.testing.assert_allclose(
+            tf_.quaternion_from_rotation_matrix(r),
+            tf_transformations.quaternion_from_matrix(r),
+        )
+
+    def test_round_trip(self):
+        """Tests that converting the quaternion back to a rotation matrix
+        returns the original matrix
+        """
+        for rotation in list(_random_rotations()) + list(EDGE_CASE_ROTATIONS):
+            r = rotation.as_matrix()
+            q = tf_.quaternion_from_rotation_matrix(r)
+            np.testing.assert_allclose(
+                tf_.rotation_matrix_from_quaternion(tf_.as_ros_quaternion(q)),
+                r,
+                atol=1e-9,
+            )
+
+
+class TestRotationMatrixFromQuaternion(unittest.TestCase):
+    """Tests :func:`.rotation_matrix_from_quaternion`"""
+
+    def test_matches_scipy(self):
+        """Tests that the rotation matrix matches SciPy for random rotations"""
+        for rotation in list(_random_rotations()) + list(EDGE_CASE_ROTATIONS):
+            q = tf_.as_ros_quaternion(rotation.as_quat())
+            np.testing.assert_allclose(
+                tf_.rotation_matrix_from_quaternion(q),
+                rotation.as_matrix(),
+                atol=1e-9,
+            )
+
+    def test_non_unit_quaternion(self):
+        """Tests that a non-unit quaternion gives the same rotation matrix as
+        the normalized quaternion
+        """
+        for rotation in _random_rotations():
+            q = rotation.as_quat()
+            np.testing.assert_allclose(
+                tf_.rotation_matrix_from_quaternion(tf_.as_ros_quaternion(3.7 * q)),
+                rotation.as_matrix(),
+                atol=1e-9,
+            )
+            np.testing.assert_allclose(
+                tf_.rotation_matrix_from_quaternion(tf_.as_ros_quaternion(-q)),
+                rotation.as_matrix(),
+                atol=1e-9,
+            )
+
+    def test_zero_quaternion(self):
+        """Tests that a zero quaternion gives the identity matrix"""
+        q = tf_.as_ros_quaternion(np.zeros(4))
+        np.testing.assert_array_equal(
+            tf_.rotation_matrix_from_quaternion(q), np.identity(3)
+        )
+
+    def test_round_trip(self):
+        """Tests that converting the rotation matrix back to a quaternion
+        returns the original quaternion with non-negative w
+        """
+        for rotation in _random_rotations():
+            q = rotation.as_quat()
+            r = tf_.rotation_matrix_from_quaternion(tf_.as_ros_quaternion(q))
+            np.testing.assert_allclose(
+                tf_.quaternion_from_rotation_matrix(r), _canonical(q), atol=1e-9
+            )
+
+
+class TestAngleOffNadir(unittest.TestCase):
+    """Tests :func:`.angle_off_nadir`"""
+
+    @staticmethod
+    def _expected(rotation: Rotation) -> float:
+        """Returns angle between rotated x-axis and nadir computed with SciPy"""
+        forward = rotation.apply([1.0, 0.0, 0.0])
+        return float(np.arccos(np.clip(np.dot(forward, [0.0, 0.0, -1.0]), -1, 1)))
+
+    def test_matches_scipy(self):
+        """Tests that the angle matches SciPy for random rotations"""
+        for rotation in list(_random_rotations()) + list(EDGE_CASE_ROTATIONS):
+            self.assertAlmostEqual(
+                tf_.angle_off_nadir(tuple(rotation.as_quat())),
+                self._expected(rotation),
+                places=6,
+            )
+
+    def test_non_unit_quaternion(self):
+        """Tests that a non-unit quaternion gives the same angle as the
+        normalized quaternion
+        """
+        for rotation in _random_rotations():
+            q = rotation.as_quat()
+            self.assertAlmostEqual(
+                tf_.angle_off_nadir(tuple(0.2 * q)),
+                tf_.angle_off_nadir(tuple(q)),
+            )
+            self.assertAlmostEqual(
+                tf_.angle_off_nadir(tuple(-q)), tf_.angle_off_nadir(tuple(q))
+            )
+
+    def test_special_cases(self):
+        """Tests the angle for zero, identity and nadir facing quaternions"""
+        self.assertAlmostEqual(tf_.angle_off_nadir((0.0, 0.0, 0.0, 0.0)), np.pi / 2)
+        self.assertAlmostEqual(tf_.angle_off_nadir((0.0, 0.0, 0.0, 1.0)), np.pi / 2)
+
+        # Pitching the x-axis down 90 degrees about the y-axis points it at nadir
+        nadir = Rotation.from_rotvec([0.0, np.pi / 2, 0.0]).as_quat()
+        self.assertAlmostEqual(tf_.angle_off_nadir(tuple(nadir)), 0.0)
+        zenith = Rotation.from_rotvec([0.0, -np.pi / 2, 0.0]).as_quat()
+        self.assertAlmostEqual(tf_.angle_off_nadir(tuple(zenith)), np.pi)
+
+
+class TestHamiltonProduct(unittest.TestCase):
+    """Tests :func:`._hamilton_product`"""
+
+    def test_matches_scipy(self):
+        """Tests that the product matches SciPy rotation composition"""
+        rotations1 = _random_rotations()
+        rotations2 = Rotation.random(SAMPLES, random_state=SEED + 1)
+        for rotation1, rotation2 in zip(rotations1, rotations2):
+            q = np.array(
+                tf_._hamilton_product(
+                    tuple(rotation1.as_quat()), tuple(rotation2.as_quat())
+                )
+            )
+            expected = (rotation1 * rotation2).as_quat()
+            if not np.allclose(q, expected, atol=1e-9):
+                np.testing.assert_allclose(q, -expected, atol=1e-9)
+
+    def test_identity(self):
+        """Tests that the identity quaternion is the neutral element"""
+        identity = (0.0, 0.0, 0.0, 1.0)
+        for rotation in EDGE_CASE_ROTATIONS:
+            q = tuple(rotation.as_quat())
+            np.testing.assert_allclose(tf_._hamilton_product(identity, q), q)
+            np.testing.assert_allclose(tf_._hamilton_product(q, identity), q)
+
+    def test_180_degree_rotations(self):
+        """Tests products of 180 degree rotations about the coordinate axes"""
+        x, y, z = (1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0)
+        np.testing.assert_allclose(tf_._hamilton_product(x, y), z)
+        np.testing.assert_allclose(tf_._hamilton_product(y, x), np.negative(z))
+        np.testing.assert_allclose(tf_._hamilton_product(x, x), (0.0, 0.0, 0.0, -1.0))
+
+
+class TestAddTransformStamped(unittest.TestCase):
+    """Tests :func:`.add_transform_stamped`"""
+
+    def setUp(self):
+        """Creates random rotations and translations for the transforms"""
+        rng = np.random.default_rng(SEED)
+        self.rotations1 = list(_random_rotations()) + list(EDGE_CASE_ROTATIONS)
+        self.rotations2 = list(Rotation.random(SAMPLES, random_state=SEED + 1)) + list(
+            EDGE_CASE_ROTATIONS[::-1]
+        )
+        self.translations1 = rng.uniform(-100, 100, (len(self.rotations1), 3))
+        self.translations2 = rng.uniform(-100, 100, (len(self.rotations2), 3))
+
+    def assertComposed(
+        self,
+        result: TransformStamped,
+        rotation1: Rotation,
+        rotation2: Rotation,
+        t1: np.ndarray,
+        t2: np.ndarray,
+    ) -> None:
+        """Asserts that the result is the composition of the two transforms"""
+        q = tf_.as_np_quaternion(result.transform.rotation)
+        self.assertGreaterEqual(q[3], 0)
+        self.assertAlmostEqual(np.linalg.norm(q), 1.0)
+        np.testing.assert_allclose(
+            Rotation.from_quat(q).as_matrix(),
+            (rotation1 * rotation2).as_matrix(),
+            atol=1e-9,
+        )
+        translation = result.transform.translation
+        np.testing.assert_allclose(
+            (translation.x, translation.y, translation.z),
+            t1 + rotation1.apply(t2),
+            atol=1e-9,
+        )
+
+    def test_matches_scipy(self):
+        """Tests that the composed transform matches SciPy"""
+        for rotation1, rotation2, t1, t2 in zip(
+            self.rotations1, self.rotations2, self.translations1, self.translations2
+        ):
+            transform1 = _transform(rotation1.as_quat(), t1, "a", "b")
+            transform2 = _transform(rotation2.as_quat(), t2, "b", "c")
+            result = tf_.add_transform_stamped(transform1, transform2)
+            self.assertComposed(result, rotation1, rotation2, t1, t2)
+            self.assertEqual(result.header.frame_id, "a")
+            self.assertEqual(result.child_frame_id, "c")
+
+    def test_non_unit_quaternions(self):
+        """Tests that non-unit and negated input quaternions are normalized"""
+        for rotation1, rotation2, t1, t2 in zip(
+            self.rotations1, self.rotations2, self.translations1, self.translations2
+        ):
+            transform1 = _transform(-2.5 * rotation1.as_quat(), t1, "a", "b")
+            transform2 = _transform(0.3 * rotation2.as_quat(), t2, "b", "c")
+            result = tf_.add_transform_stamped(transform1, transform2)
+            self.assertComposed(result, rotation1, rotation2, t1, t2)
+
+    def test_zero_quaternions(self):
+        """Tests that zero quaternions are treated as identity rotations"""
+        rotation = Rotation.from_euler("xyz", [10, -20, 30], degrees=True)
+        t1 = np.array([1.0, 2.0, 3.0])
+        t2 = np.array([-4.0, 5.0, -6.0])
+        identity = Rotation.identity()
+
+        transform1 = _transform(np.zeros(4), t1, "a", "b")
+        transform2 = _transform(rotation.as_quat(), t2, "b", "c")
+        result = tf_.add_transform_stamped(transform1, transform2)
+        self.assertComposed(result, identity, rotation, t1, t2)
+
+        transform1 = _transform(rotation.as_quat(), t1, "a", "b")
+        transform2 = _transform(np.zeros(4), t2, "b", "c")
+        result = tf_.add_transform_stamped(transform1, transform2)
+        self.assertComposed(result, rotation, identity, t1, t2)
+
+    def test_pose_stamped(self):
+        """Tests that the first transform can also be a pose"""
+        rotation1, rotation2 = self.rotations1[0], self.rotations2[0]
+        t1, t2 = self.translations1[0], self.translations2[0]
+        pose = PoseStamped()
+        pose.header.frame_id = "a"
+        pose.pose.orientation = tf_.as_ros_quaternion(rotation1.as_quat())
+        pose.pose.position.x, pose.pose.position.y, pose.pose.position.z = t1.tolist()
+        transform2 = _transform(rotation2.as_quat(), t2, "b", "c")
+        result = tf_.add_transform_stamped(pose, transform2)
+        self.assertComposed(result, rotation1, rotation2, t1, t2)
+        self.assertEqual(result.header.frame_id, "a")
+
+
+if __name__ == "__main__":
+    unittest.main()